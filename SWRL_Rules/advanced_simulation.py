@@ -12,11 +12,40 @@ Separation of Concerns:
 - temporal_beer_game_rules.py: Logic, Decisions, Metrics
 """
 
-import requests
 import random
 import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from graphdb_session import make_session
 from temporal_beer_game_rules_v2 import TemporalBeerGameRuleExecutor
 
+try:
+    import orjson  # Optional: faster report serialization
+except ImportError:
+    orjson = None
+
+# Max UPDATE operations sent in one request by flush_updates()
+MAX_BATCH_SIZE = 1000
+
+# Federation repository spanning the four actor repositories
+FEDERATION_REPO = "BG_Supply_Chain"
+
+# Max number of SELECT results kept by the orchestrator's query cache
+QUERY_CACHE_SIZE = 16
+
+# Backoff (seconds) between checks that a week's results are visible
+WEEK_READY_DELAYS = (0.05, 0.1, 0.2, 0.4, 0.8)
+
+# Week summary fields: (summary key, SPARQL variable, cast, default if unbound)
+WEEK_SUMMARY_FIELDS = (
+    ("inventory", "inv", int, 0),
+    ("backlog", "backlog", int, 0),
+    ("coverage", "coverage", float, 0.0),
+    ("suggested_order", "suggested", int, 0),
+    ("total_cost", "cost", float, 0.0),
+)
+
 
 class BeerGameOrchestrator:
     """
@@ -33,9 +62,14 @@ class BeerGameOrchestrator:
     - Create shipments/orders (rules do this)
     """
     
-    def __init__(self, base_url="http://localhost:7200"):
+    def __init__(self, base_url="http://localhost:7200", verbose=False):
         self.base_url = base_url
-        self.session = requests.Session()
+        
+        # Per-order and [DEBUG] progress lines are only printed when verbose
+        self.verbose = verbose
+        
+        # One keep-alive session for every GraphDB call (pooled connections)
+        self.session = make_session(base_url)
         
         # Supply chain configuration
         self.supply_chain = {
@@ -61,14 +95,49 @@ class BeerGameOrchestrator:
             }
         }
         
+        # Derived, run-invariant config: full namespace IRI per actor and
+        # the actor name for each actor URI
+        for config in self.supply_chain.values():
+            config['namespace_uri'] = f"http://beergame.org/{config['namespace'][3:]}#"
+        self.actor_by_uri = {config['uri']: actor_name
+                             for actor_name, config in self.supply_chain.items()}
+        
+        # PREFIX declarations shared by every query (built once)
+        self.prefix_header = "\n".join(
+            ["PREFIX bg: <http://beergame.org/ontology#>",
+             "PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>",
+             "PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>"]
+            + [f"PREFIX {config['namespace']}: <{config['namespace_uri']}>"
+               for config in self.supply_chain.values()]
+        )
+        
         # Rule executor
         self.rule_executor = TemporalBeerGameRuleExecutor(base_url)
         
         # Results tracking
         self.results = []
+        
+        # UPDATE operations buffered per repository until flush_updates()
+        self._pending_updates = {}
+        
+        # Worker threads for independent per-repository queries
+        self._pool = ThreadPoolExecutor(max_workers=len(self.supply_chain))
+        
+        # SELECT result cache keyed on (repository, query, epoch).
+        # The epoch is bumped on every write (ours or the rule executor's),
+        # so a hit is only possible while the KG is unchanged.
+        self._query_cache = OrderedDict()
+        self._cache_lock = threading.Lock()  # pool workers share the cache
+        self._kg_epoch = 0
     
     def _execute_query(self, query, repository):
         """Execute SPARQL SELECT query"""
+        key = (repository, query, self._kg_epoch)
+        with self._cache_lock:
+            if key in self._query_cache:
+                self._query_cache.move_to_end(key)
+                return self._query_cache[key]
+        
         endpoint = f"{self.base_url}/repositories/{repository}"
         headers = {"Accept": "application/sparql-results+json"}
         
@@ -81,7 +150,12 @@ class BeerGameOrchestrator:
             )
             
             if response.status_code == 200:
-                return response.json()
+                result = response.json()
+                with self._cache_lock:
+                    self._query_cache[key] = result
+                    if len(self._query_cache) > QUERY_CACHE_SIZE:
+                        self._query_cache.popitem(last=False)
+                return result
             else:
                 print(f"Query error: {response.status_code}")
                 return {}
@@ -89,6 +163,33 @@ class BeerGameOrchestrator:
             print(f"Query exception: {e}")
             return {}
     
+    def _execute_queries(self, queries):
+        """Run (sparql, repository) SELECTs concurrently, results in input order"""
+        return list(self._pool.map(lambda q: self._execute_query(*q), queries))
+    
+    def _queue_update(self, update, repository):
+        """Buffer SPARQL UPDATE; sent with the next flush_updates()"""
+        self._pending_updates.setdefault(repository, []).append(update)
+    
+    def flush_updates(self):
+        """
+        Send buffered updates, one request per repository (';'-separated
+        operations, at most MAX_BATCH_SIZE per request)
+        
+        Returns {repository: True if every request succeeded}
+        """
+        status = {}
+        if self._pending_updates:
+            self._kg_epoch += 1
+        for repository, updates in self._pending_updates.items():
+            ok = True
+            for i in range(0, len(updates), MAX_BATCH_SIZE):
+                batch = " ;\n".join(updates[i:i + MAX_BATCH_SIZE])
+                ok = self._execute_update(batch, repository) and ok
+            status[repository] = ok
+        self._pending_updates = {}
+        return status
+    
     def _execute_update(self, update, repository):
         """Execute SPARQL UPDATE query"""
         endpoint = f"{self.base_url}/repositories/{repository}/statements"
@@ -101,6 +202,9 @@ class BeerGameOrchestrator:
                 headers=headers,
                 timeout=30
             )
+            if response.status_code != 204:
+                print(f"Update failed on {repository}: {response.status_code}")
+                print(f"   Response: {response.text[:200]}")
             return response.status_code == 204
         except Exception as e:
             print(f"Update exception: {e}")
@@ -136,15 +240,12 @@ class BeerGameOrchestrator:
         config = self.supply_chain["Retailer"]
         
         update = f"""
-            PREFIX bg: <http://beergame.org/ontology#>
-            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            PREFIX {config['namespace']}: <http://beergame.org/{config['namespace'].replace('bg_', '')}#>
+            {self.prefix_header}
             
             INSERT {{
                 {config['namespace']}:CustomerDemand_Week{week} a bg:CustomerDemand ;
                     bg:forWeek bg:Week_{week} ;
-                    bg:belongsTo {config['uri']} ;
+                    bg:belongsTo <{config['uri']}> ;
                     bg:actualDemand "{demand}"^^xsd:integer ;
                     rdfs:comment "Customer demand for Week {week}" .
             }}
@@ -155,7 +256,8 @@ class BeerGameOrchestrator:
             }}
         """
         
-        self._execute_update(update, config['repo'])
+        self._queue_update(update, config['repo'])
+        self.flush_updates()  # Rules read the demand next
         print(f"      Customer demand: {demand} units")
         
         return demand
@@ -166,49 +268,15 @@ class BeerGameOrchestrator:
         print("="*60)
         
         summary = {}
+        rows = self._query_week_summary_rows(week)
         
         for actor_name, config in self.supply_chain.items():
-            query = f"""
-                PREFIX bg: <http://beergame.org/ontology#>
-                PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-                
-                SELECT ?inv ?backlog ?coverage ?suggested ?cost
-                WHERE {{
-                    # Get inventory
-                    OPTIONAL {{
-                        ?invEntity a bg:Inventory ;
-                                   bg:forWeek bg:Week_{week} ;
-                                   bg:belongsTo <{config['uri']}> ;
-                                   bg:currentInventory ?inv ;
-                                   bg:backlog ?backlog .
-                    }}
-                    
-                    # Get metrics
-                    OPTIONAL {{
-                        <{config['uri']}> bg:hasMetrics ?metrics .
-                        ?metrics bg:forWeek bg:Week_{week} ;
-                                 bg:inventoryCoverage ?coverage ;
-                                 bg:suggestedOrderQuantity ?suggested .
-                    }}
-                    
-                    # Get total cost
-                    OPTIONAL {{
-                        <{config['uri']}> bg:totalCost ?cost .
-                    }}
-                }}
-            """
-            
-            result = self._execute_query(query, config['repo'])
-            bindings = result.get("results", {}).get("bindings", [])
+            b = rows.get(config['uri'])
             
-            if bindings:
-                b = bindings[0]
+            if b is not None:
                 actor_data = {
-                    "inventory": int(b.get("inv", {}).get("value", 0)),
-                    "backlog": int(b.get("backlog", {}).get("value", 0)),
-                    "coverage": float(b.get("coverage", {}).get("value", 0.0)),
-                    "suggested_order": int(b.get("suggested", {}).get("value", 0)),
-                    "total_cost": float(b.get("cost", {}).get("value", 0.0))
+                    key: cast(b[var]["value"]) if var in b else default
+                    for key, var, cast, default in WEEK_SUMMARY_FIELDS
                 }
                 summary[actor_name] = actor_data
                 
@@ -222,6 +290,64 @@ class BeerGameOrchestrator:
         print("="*60)
         return summary
     
+    def _week_summary_query(self, week, actor_uris):
+        """Week summary SELECT for the given actors, one row per actor"""
+        actor_values = " ".join(f"<{uri}>" for uri in actor_uris)
+        return f"""
+            {self.prefix_header}
+            
+            SELECT ?actor ?inv ?backlog ?coverage ?suggested ?cost
+            WHERE {{
+                VALUES ?actor {{ {actor_values} }}
+                
+                # Get inventory (week pattern first: most selective)
+                OPTIONAL {{
+                    ?invEntity bg:forWeek bg:Week_{week} ;
+                               a bg:Inventory ;
+                               bg:belongsTo ?actor ;
+                               bg:currentInventory ?inv ;
+                               bg:backlog ?backlog .
+                }}
+                
+                # Get metrics
+                OPTIONAL {{
+                    ?metrics bg:forWeek bg:Week_{week} .
+                    ?actor bg:hasMetrics ?metrics .
+                    ?metrics bg:inventoryCoverage ?coverage ;
+                             bg:suggestedOrderQuantity ?suggested .
+                }}
+                
+                # Get total cost
+                OPTIONAL {{
+                    ?actor bg:totalCost ?cost .
+                }}
+            }}
+        """
+    
+    def _query_week_summary_rows(self, week):
+        """
+        First result row per actor URI for the week summary
+        
+        Reads all four actors with one query on the federation and falls
+        back to one query per actor repository if that fails
+        """
+        actor_uris = [config['uri'] for config in self.supply_chain.values()]
+        result = self._execute_query(self._week_summary_query(week, actor_uris), FEDERATION_REPO)
+        
+        if not result:
+            result = {"results": {"bindings": []}}
+            actor_results = self._execute_queries([
+                (self._week_summary_query(week, [uri]), config['repo'])
+                for uri, config in zip(actor_uris, self.supply_chain.values())
+            ])
+            for actor_result in actor_results:
+                result["results"]["bindings"] += actor_result.get("results", {}).get("bindings", [])
+        
+        rows = {}
+        for b in result.get("results", {}).get("bindings", []):
+            rows.setdefault(b["actor"]["value"], b)
+        return rows
+    
     def propagate_orders_to_receivers(self, week):
         """
         Copy orders to receiver repositories so they can create shipments
@@ -239,88 +365,88 @@ class BeerGameOrchestrator:
         ]
         
         total_propagated = 0
+        queued = []  # (sender_name, receiver_name, receiver_repo, count)
         
-        for sender_repo, receiver_repo, sender_name, receiver_name in flows:
-            print(f"   Checking {sender_name} → {receiver_name}...")
-            
-            # Query orders in sender repo
+        # Query orders in all sender repos at once. Only the sender's own
+        # orders: copies received from downstream are not forwarded again
+        queries = []
+        for sender_repo, _, sender_name, _ in flows:
             query = f"""
-                PREFIX bg: <http://beergame.org/ontology#>
-                SELECT ?placedBy ?receivedBy ?qty
+                {self.prefix_header}
+                SELECT ?receivedBy ?qty
                 WHERE {{
                     ?order a bg:Order ;
                            bg:forWeek bg:Week_{week} ;
-                           bg:placedBy ?placedBy ;
+                           bg:placedBy <{self.supply_chain[sender_name]['uri']}> ;
                            bg:receivedBy ?receivedBy ;
                            bg:orderQuantity ?qty .
                 }}
             """
+            queries.append((query, sender_repo))
+        all_results = self._execute_queries(queries)
+        
+        for (sender_repo, receiver_repo, sender_name, receiver_name), result in zip(flows, all_results):
+            print(f"   Checking {sender_name} → {receiver_name}...")
+            
+            if not result:
+                print(f"      ✗ Query failed for {sender_repo}")
+                continue
             
             try:
-                response = requests.post(
-                    f"{self.base_url}/repositories/{sender_repo}",
-                    data={"query": query},
-                    headers={"Accept": "application/sparql-results+json"},
-                    timeout=10
-                )
+                bindings = result.get("results", {}).get("bindings", [])
+                print(f"      Found {len(bindings)} orders to propagate")
                 
-                if response.status_code == 200:
-                    bindings = response.json().get("results", {}).get("bindings", [])
-                    print(f"      Found {len(bindings)} orders to propagate")
-                    
-                    if not bindings:
-                        print(f"      ⚠️  No orders found in {sender_repo} for Week {week}")
-                        continue
+                if not bindings:
+                    print(f"      ⚠️  No orders found in {sender_repo} for Week {week}")
+                    continue
+                
+                # One INSERT DATA block per receiver for all of the flow's orders
+                placed_by = self.supply_chain[sender_name]['uri']
+                triples = []
+                for b in bindings:
+                    received_by = b['receivedBy']['value']
+                    qty = b['qty']['value']
                     
-                    for b in bindings:
-                        placed_by = b['placedBy']['value']
-                        received_by = b['receivedBy']['value']
-                        qty = b['qty']['value']
-                        
+                    if self.verbose:
                         print(f"      Processing order: {qty} units, {placed_by} → {received_by}")
+                    
+                    # Receiver prefix comes from the precomputed URI lookup
+                    receiver_ns = self.supply_chain[self.actor_by_uri[received_by]]['namespace']
+                    
+                    triples.append(f"""
+                            {receiver_ns}:Order_Week{week}_From{sender_name} a bg:Order ;
+                                bg:forWeek bg:Week_{week} ;
+                                bg:placedBy <{placed_by}> ;
+                                bg:receivedBy <{received_by}> ;
+                                bg:orderQuantity "{qty}"^^xsd:integer .""")
+                
+                # Create orders in receiver's repo
+                print(f"      Queueing insert of {len(triples)} order(s) to {receiver_repo}...")
+                for i in range(0, len(triples), MAX_BATCH_SIZE):
+                    insert = f"""
+                        {self.prefix_header}
                         
-                        # Extract short names from URIs
-                        sender_short = placed_by.split('#')[1].split('_')[0]
-                        receiver_ns = received_by.split('#')[0]
-                        
-                        # Create order in receiver's repo
-                        insert = f"""
-                            PREFIX bg: <http://beergame.org/ontology#>
-                            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-                            PREFIX ns: <{receiver_ns}#>
-                            
-                            INSERT DATA {{
-                                ns:Order_Week{week}_From{sender_short} a bg:Order ;
-                                    bg:forWeek bg:Week_{week} ;
-                                    bg:placedBy <{placed_by}> ;
-                                    bg:receivedBy <{received_by}> ;
-                                    bg:orderQuantity "{qty}"^^xsd:integer .
-                            }}
-                        """
-                        
-                        print(f"      Inserting to {receiver_repo}...")
-                        
-                        resp = requests.post(
-                            f"{self.base_url}/repositories/{receiver_repo}/statements",
-                            data=insert,
-                            headers={"Content-Type": "application/sparql-update"},
-                            timeout=10
-                        )
+                        INSERT DATA {{{"".join(triples[i:i + MAX_BATCH_SIZE])}
+                        }}
+                    """
+                    self._queue_update(insert, receiver_repo)
+                
+                queued.append((sender_name, receiver_name, receiver_repo, len(bindings)))
                         
-                        if resp.status_code == 204:
-                            print(f"      ✓ Propagated order {sender_name}→{receiver_name}")
-                            total_propagated += 1
-                        else:
-                            print(f"      ✗ Failed to propagate {sender_name}→{receiver_name}: {resp.status_code}")
-                            print(f"         Response: {resp.text[:200]}")
-                else:
-                    print(f"      ✗ Query failed: {response.status_code}")
-                            
             except Exception as e:
                 print(f"      ✗ Error propagating {sender_name}→{receiver_name}: {e}")
                 import traceback
                 traceback.print_exc()
         
+        # One request per receiver repository for all of this week's orders
+        status = self.flush_updates()
+        for sender_name, receiver_name, receiver_repo, count in queued:
+            if status.get(receiver_repo):
+                print(f"   ✓ Propagated {count} order(s) {sender_name}→{receiver_name}")
+                total_propagated += count
+            else:
+                print(f"   ✗ Failed to propagate {sender_name}→{receiver_name}")
+        
         print(f"\n   Total orders propagated: {total_propagated}")
     
     def simulate_week(self, week, demand_pattern="stable"):
@@ -336,17 +462,19 @@ class BeerGameOrchestrator:
         print(f"\n{'#'*80}")
         print(f"📅 WEEK {week} - SIMULATION")
         print(f"{'#'*80}")
-        try
-        
+        try:
+            
             # Step 1: Create temporal structure
             print(f"\n🏗️  Creating temporal structure...")
             self.rule_executor.create_week_entity(week)
             
             # Only create ActorMetrics for Week > 1 (Week 1 is in initial TTL)
             if week > 1:
-                print("\n   [DEBUG] CHECKPOINT 1: After execute_week_rules")
+                if self.verbose:
+                    print("\n   [DEBUG] CHECKPOINT 1: After execute_week_rules")
                 self.rule_executor.create_actor_metrics_snapshot(week)
                 self.rule_executor.create_inventory_snapshot(week)
+            self._kg_epoch += 1
             
             # Step 2: Generate external event
             demand = self.generate_customer_demand(week, demand_pattern)
@@ -355,15 +483,19 @@ class BeerGameOrchestrator:
             print(f"\n   Executing business rules...")
             repos = [config['repo'] for config in self.supply_chain.values()]
             self.rule_executor.execute_week_rules(week, repos)
-            print("\n   [DEBUG] CHECKPOINT 1: After execute_week_rules")
+            self._kg_epoch += 1
+            if self.verbose:
+                print("\n   [DEBUG] CHECKPOINT 1: After execute_week_rules")
             
             # Step 3.5: Propagate orders to receiver repositories
             # (so receivers can create shipments in response)
-            print(f"\n   [DEBUG] Week={week}, checking if should propagate (week > 1)...")
+            if self.verbose:
+                print(f"\n   [DEBUG] Week={week}, checking if should propagate (week > 1)...")
             if week > 1:  # Week 1 orders already in TTL
-                print(f"   [DEBUG] Calling propagate_orders_to_receivers({week})...")
+                if self.verbose:
+                    print(f"   [DEBUG] Calling propagate_orders_to_receivers({week})...")
                 self.propagate_orders_to_receivers(week)
-            else:
+            elif self.verbose:
                 print(f"   [DEBUG] Skipping propagation for Week 1 (orders in TTL)")
             
             # Step 4: Read results
@@ -376,33 +508,33 @@ class BeerGameOrchestrator:
             }
             
         except Exception as e:
-        print(f"\n❌ EXCEPTION in simulate_week: {e}")
-        import traceback
-        traceback.print_exc()
-        raise
+            print(f"\n❌ EXCEPTION in simulate_week: {e}")
+            import traceback
+            traceback.print_exc()
+            raise
     
-    def get_existing_weeks(self):
-        """Query GraphDB to find which weeks already exist"""
+    def get_max_existing_week(self):
+        """Query GraphDB for the highest week that already exists (0 if none)"""
         print("\n🔍 Checking for existing weeks...")
         
         # Query any repository (they all have the same weeks)
         repo = list(self.supply_chain.values())[0]['repo']
         
+        # Aggregate server-side: one row instead of every week number
         query = """
             PREFIX bg: <http://beergame.org/ontology#>
             
-            SELECT DISTINCT ?weekNum
+            SELECT (COALESCE(MAX(?weekNum), 0) AS ?maxWeek)
             WHERE {
                 ?week a bg:Week ;
                       bg:weekNumber ?weekNum .
             }
-            ORDER BY ?weekNum
         """
         
         endpoint = f"{self.base_url}/repositories/{repo}"
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 endpoint,
                 data={"query": query},
                 headers={"Accept": "application/sparql-results+json"},
@@ -412,53 +544,85 @@ class BeerGameOrchestrator:
             if response.status_code == 200:
                 result = response.json()
                 bindings = result.get("results", {}).get("bindings", [])
-                weeks = [int(b['weekNum']['value']) for b in bindings]
+                max_week = int(bindings[0]['maxWeek']['value']) if bindings else 0
                 
-                if weeks:
-                    print(f"   Found existing weeks: {weeks}")
+                if max_week:
+                    print(f"   Found existing weeks up to Week {max_week}")
                 else:
                     print(f"   No existing weeks found (clean start)")
                 
-                return weeks
+                return max_week
             else:
                 print(f"   ⚠️  Could not query existing weeks: {response.status_code}")
-                return []
+                return 0
         
         except Exception as e:
             print(f"   ⚠️  Error checking existing weeks: {e}")
-            return []
+            return 0
     
-    def run_simulation(self, weeks=4, demand_pattern="stable"):
-        """Run multi-week simulation (incremental - only simulates new weeks)"""
-        
-        # Check which weeks already exist
-        existing_weeks = self.get_existing_weeks()
-        max_existing = max(existing_weeks) if existing_weeks else 0
-        
-        if max_existing >= weeks:
-            print(f"\n⚠️  Weeks 1-{weeks} already simulated (max existing: {max_existing})")
-            print(f"   To re-simulate, run clean_temporal_data.py first")
-            print(f"   Or specify more weeks (e.g., {max_existing + 1}+)")
-            return
+    def _wait_for_week(self, week):
+        """
+        Wait until the week's Inventory snapshot is visible, polling with
+        an ASK (backoff from WEEK_READY_DELAYS, about 1.5 s at most)
+        """
+        config = self.supply_chain["Retailer"]
+        query = f"""
+            {self.prefix_header}
+            ASK {{ ?inv bg:forWeek bg:Week_{week} ; a bg:Inventory ; bg:belongsTo <{config['uri']}> . }}
+        """
+        endpoint = f"{self.base_url}/repositories/{config['repo']}"
         
-        start_week = max_existing + 1
+        # Not through _execute_query: a cached 'false' would never change
+        for delay in (0,) + WEEK_READY_DELAYS:
+            time.sleep(delay)
+            try:
+                response = self.session.post(
+                    endpoint,
+                    data={"query": query},
+                    headers={"Accept": "application/sparql-results+json"},
+                    timeout=10
+                )
+                if response.status_code == 200 and response.json().get("boolean"):
+                    return True
+            except Exception as e:
+                print(f"   ⚠️  Error checking Week {week} results: {e}")
         
-        print(f"\n{'='*80}")
-        print(f"🎮 BEER GAME SIMULATION - WEEKS {start_week} TO {weeks}")
-        if start_week > 1:
-            print(f"   Resuming from Week {start_week} (Weeks 1-{max_existing} already exist)")
-        print(f"   Demand Pattern: {demand_pattern}")
-        print(f"{'='*80}")
+        print(f"   ⚠️  Week {week} Inventory not visible yet, continuing")
+        return False
+    
+    def run_simulation(self, weeks=4, demand_pattern="stable"):
+        """Run multi-week simulation (incremental - only simulates new weeks)"""
         
-        for week in range(start_week, weeks + 1):
-            result = self.simulate_week(week, demand_pattern)
-            result['demand_pattern'] = demand_pattern  # Add pattern to result
-            self.results.append(result)
+        try:
+            # Check which weeks already exist
+            max_existing = self.get_max_existing_week()
             
-            if week < weeks:
-                time.sleep(1)
-        
-        self.generate_final_report()
+            if max_existing >= weeks:
+                print(f"\n⚠️  Weeks 1-{weeks} already simulated (max existing: {max_existing})")
+                print(f"   To re-simulate, run clean_temporal_data.py first")
+                print(f"   Or specify more weeks (e.g., {max_existing + 1}+)")
+                return
+            
+            start_week = max_existing + 1
+            
+            print(f"\n{'='*80}")
+            print(f"🎮 BEER GAME SIMULATION - WEEKS {start_week} TO {weeks}")
+            if start_week > 1:
+                print(f"   Resuming from Week {start_week} (Weeks 1-{max_existing} already exist)")
+            print(f"   Demand Pattern: {demand_pattern}")
+            print(f"{'='*80}")
+            
+            for week in range(start_week, weeks + 1):
+                result = self.simulate_week(week, demand_pattern)
+                result['demand_pattern'] = demand_pattern  # Add pattern to result
+                self.results.append(result)
+                
+                if week < weeks:
+                    self._wait_for_week(week)
+            
+            self.generate_final_report()
+        finally:
+            self._pool.shutdown()
     
     def generate_final_report(self):
         """Generate final simulation report with rich data"""
@@ -488,8 +652,11 @@ class BeerGameOrchestrator:
         import json
         from datetime import datetime
         
-        # Build detailed weekly data
+        # Build detailed weekly data and the performance aggregates in one pass
         weekly_details = []
+        weeks_without_backlog = 0
+        total_inv = 0
+        inv_count = 0
         for result in self.results:
             week_data = {
                 "week": result['week'],
@@ -505,9 +672,20 @@ class BeerGameOrchestrator:
                     "suggested_order": actor_summary['suggested_order'],
                     "total_cost": actor_summary['total_cost']
                 }
+                total_inv += actor_summary['inventory']
+                inv_count += 1
+            
+            retailer = result['summary'].get("Retailer")
+            if retailer is not None and retailer['backlog'] == 0:
+                weeks_without_backlog += 1
             
             weekly_details.append(week_data)
         
+        total_backlog = sum(
+            actor_summary['backlog']
+            for actor_summary in self.results[-1]['summary'].values()
+        )
+        
         report = {
             "metadata": {
                 "simulation_date": datetime.now().isoformat(),
@@ -527,56 +705,24 @@ class BeerGameOrchestrator:
                 "total_cost": sum(final_costs.values())
             },
             "performance": {
-                "retailer_service_level": self._calculate_service_level("Retailer"),
-                "average_inventory": self._calculate_avg_inventory(),
-                "total_backlog": self._calculate_total_backlog()
+                "retailer_service_level": weeks_without_backlog / len(self.results),
+                "average_inventory": total_inv / inv_count if inv_count > 0 else 0.0,
+                "total_backlog": total_backlog
             }
         }
         
         report_file = f"beer_game_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
         try:
-            with open(report_file, 'w') as f:
-                json.dump(report, f, indent=2)
+            if orjson is not None:
+                with open(report_file, 'wb') as f:
+                    f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+            else:
+                with open(report_file, 'w') as f:
+                    json.dump(report, f, indent=2)
             print(f"📄 Report saved to: {report_file}")
         except Exception as e:
             print(f"⚠️  Could not save report: {e}")
-    
-    def _calculate_service_level(self, actor_name):
-        """Calculate service level (weeks without backlog / total weeks)"""
-        if not self.results:
-            return 0.0
-        
-        weeks_without_backlog = sum(
-            1 for r in self.results 
-            if actor_name in r['summary'] and r['summary'][actor_name]['backlog'] == 0
-        )
-        return weeks_without_backlog / len(self.results)
-    
-    def _calculate_avg_inventory(self):
-        """Calculate average inventory across all actors and weeks"""
-        if not self.results:
-            return 0.0
-        
-        total_inv = 0
-        count = 0
-        for result in self.results:
-            for actor_summary in result['summary'].values():
-                total_inv += actor_summary['inventory']
-                count += 1
-        
-        return total_inv / count if count > 0 else 0.0
-    
-    def _calculate_total_backlog(self):
-        """Calculate total backlog across all actors in final week"""
-        if not self.results:
-            return 0
-        
-        final_week = self.results[-1]
-        return sum(
-            actor_summary['backlog'] 
-            for actor_summary in final_week['summary'].values()
-        )
 
 
 def main():
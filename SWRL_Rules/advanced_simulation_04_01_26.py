@@ -4,11 +4,12 @@ Simulates the complete beer game dynamics: demand, orders, shipments, inventory
 UPDATED: SHACL compliant (integer quantities, arrivalWeek as IRI, receivedBy/shippedTo)
 """
 
-import time
 import json
 import random
-import requests
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from graphdb_session import make_session
 
 # Import from the correct file - temporal_beer_game_rules.py
 try:
@@ -19,6 +20,14 @@ except ImportError:
     print("  Make sure temporal_beer_game_rules.py is in the same directory")
     raise
 
+try:
+    import orjson  # Optional: faster result parsing and report serialization
+except ImportError:
+    orjson = None
+
+# Federation repository spanning the four actor repositories
+FEDERATION_REPO = "BG_Supply_Chain"
+
 
 class BeerGameDynamicSimulation:
     """
@@ -30,10 +39,16 @@ class BeerGameDynamicSimulation:
     - Rule execution for metrics and anomaly detection
     """
     
-    def __init__(self, graphdb_url="http://localhost:7200"):
+    def __init__(self, graphdb_url="http://localhost:7200", seed=None, verbose=False):
         self.graphdb_url = graphdb_url
+        
+        # [DEBUG] request/response dumps are only printed when verbose
+        self.verbose = verbose
         self.rule_executor = TemporalBeerGameRuleExecutor(graphdb_url)
-        self.session = requests.Session()
+        
+        # One keep-alive session for every GraphDB call (pooled connections,
+        # enough for the per-actor worker threads)
+        self.session = make_session(graphdb_url)
         
         # Supply chain configuration (upstream flow)
         self.supply_chain = {
@@ -67,8 +82,58 @@ class BeerGameDynamicSimulation:
             }
         }
         
-        self.results = []
+        # Derived, run-invariant config: full namespace IRI and the actor
+        # each one ships to (the one that names it as upstream)
+        for config in self.supply_chain.values():
+            config['namespace_uri'] = f"http://beergame.org/{config['namespace'][3:]}#"
+            config['downstream_actor'] = None
+        for actor_name, config in self.supply_chain.items():
+            if config['upstream_actor']:
+                self.supply_chain[config['upstream_actor']]['downstream_actor'] = actor_name
+        
+        # PREFIX block sent once at the head of every batched update
+        self.prefix_header = "\n".join(
+            ["PREFIX bg: <http://beergame.org/ontology#>",
+             "PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>"]
+            + [f"PREFIX {config['namespace']}: <{config['namespace_uri']}>"
+               for config in self.supply_chain.values()]
+        )
+        
+        # Per-simulation RNG: the same seed replays the same random demand
+        self.seed = seed
+        self._rng = random.Random(seed)
+        
+        # Week results are streamed to <report_base>.ndjson, not kept in memory
+        self.weeks_simulated = 0
         self.start_time = None
+        self.report_base = None
+        
+        # Triple blocks queued per repository, sent by _flush_updates()
+        self._pending_triples = defaultdict(list)
+        
+        # One worker per actor: per-actor SELECTs hit independent repositories
+        self._pool = ThreadPoolExecutor(max_workers=len(self.supply_chain))
+        
+        # Stock written by update_inventories, keyed by actor: (week, stock)
+        self._last_inventory = {}
+        
+        # bg:shippingDelay per actor (static during a run)
+        self._shipping_delays = {}
+        
+        # Shipments by arrival week: {arrival week: {receiver: qty}}.
+        # Seeded from GraphDB at the start of the run, then kept up to date
+        # by create_shipments; only trusted once the seed query succeeded.
+        self._pending_arrivals = {}
+        self._ledger_loaded = False
+        
+        # Seeded shipments as (IRI, arrival week, receiver, qty). A re-run
+        # mints the same Shipment_Week{N} IRIs, and re-inserting an
+        # identical shipment leaves one copy in the store, so it must not
+        # be counted twice.
+        self._stored_shipments = set()
+        
+        # Zero per actor, copied for each week's arrivals
+        self._zero_by_actor = dict.fromkeys(self.supply_chain, 0)
         
     def run_simulation(self, weeks=4, demand_pattern="stable"):
         """
@@ -78,27 +143,40 @@ class BeerGameDynamicSimulation:
             weeks (int): Number of weeks
             demand_pattern (str): 'stable', 'spike', 'increasing', 'random'
         """
-        self.start_time = datetime.now()
-        
-        print(f"\n{'='*80}")
-        print(f"🎮 BEER GAME DYNAMIC SIMULATION")
-        print(f"{'='*80}")
-        print(f"   Start: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"   Weeks: {weeks}")
-        print(f"   Demand pattern: {demand_pattern}")
-        print(f"{'='*80}\n")
-        
-        for week in range(1, weeks + 1):
-            print(f"\n{'#'*80}")
-            print(f"📅 WEEK {week} - SIMULATION STEP")
-            print(f"{'#'*80}")
-            
-            week_result = self.simulate_week(week, demand_pattern)
-            self.results.append(week_result)
-            
-            time.sleep(1)  # Brief pause
-        
-        self.generate_report()
+        try:
+            self.start_time = datetime.now()
+            
+            print(f"\n{'='*80}")
+            print(f"🎮 BEER GAME DYNAMIC SIMULATION")
+            print(f"{'='*80}")
+            print(f"   Start: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+            print(f"   Weeks: {weeks}")
+            print(f"   Demand pattern: {demand_pattern}")
+            print(f"{'='*80}\n")
+            
+            timestamp = self.start_time.strftime("%Y%m%d_%H%M%S")
+            self.report_base = f"beer_game_dynamic_sim_{timestamp}"
+            
+            # Shipments already stored in GraphDB, before this run adds any
+            self._ledger_loaded = self._load_stored_arrivals()
+            
+            # One JSON line per week, written as soon as the week completes
+            with open(f"{self.report_base}.ndjson", 'wb') as results_file:
+                for week in range(1, weeks + 1):
+                    print(f"\n{'#'*80}")
+                    print(f"📅 WEEK {week} - SIMULATION STEP")
+                    print(f"{'#'*80}")
+                    
+                    week_result = self.simulate_week(week, demand_pattern)
+                    if orjson is not None:
+                        results_file.write(orjson.dumps(week_result) + b"\n")
+                    else:
+                        results_file.write(json.dumps(week_result, separators=(',', ':')).encode() + b"\n")
+                    self.weeks_simulated += 1
+            
+            self.generate_report()
+        finally:
+            self._pool.shutdown()
     
     def simulate_week(self, week, demand_pattern):
         """Simulate one complete week"""
@@ -124,6 +202,9 @@ class BeerGameDynamicSimulation:
         inventories = self.update_inventories(week, demand, arrivals)
         result["phases"]["inventories"] = inventories
         
+        # Rules read demand and inventory, so commit them first
+        self._flush_updates()
+        
         # PHASE 4: Execute SPARQL rules (calculate metrics, detect risks)
         print(f"\n→ Phase 4: Executing business rules...")
         executed, failed = self.rule_executor.execute_federated_week_simulation(
@@ -141,6 +222,8 @@ class BeerGameDynamicSimulation:
         shipments = self.create_shipments(week, orders)
         result["phases"]["shipments"] = shipments
         
+        self._flush_updates()
+        
         return result
     
     # def generate_customer_demand(self, week, pattern="stable"):
@@ -185,51 +268,61 @@ class BeerGameDynamicSimulation:
         elif demand_pattern == "increasing":
             demand = base_demand + (week - 1)
         elif demand_pattern == "random":
-            demand = random.randint(2, 8)
+            demand = self._rng.randint(2, 8)
         else:
             demand = base_demand
     
         # Insert CustomerDemand into Retailer repository
-        # Use PREFIX declarations with INSERT WHERE (not INSERT DATA)
-        query = f"""
-            PREFIX bg: <http://beergame.org/ontology#>
-            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-            PREFIX bg_retailer: <http://beergame.org/retailer#>
-            
-            INSERT {{
+        # (triples only: _flush_updates wraps them with PREFIXes and INSERT)
+        triples = f"""
                 bg_retailer:CustomerDemand_Week{week} a bg:CustomerDemand ;
                     bg:forWeek bg:Week_{week} ;
                     bg:actualDemand "{demand}"^^xsd:integer ;
-                    bg:demandPattern "{demand_pattern}" .
-            }}
-            WHERE {{}}
-        """
+                    bg:demandPattern "{demand_pattern}" ."""
     
-        self._execute_update(query, "BG_Retailer")
+        self._queue_triples(triples, "BG_Retailer")
         return demand
     
     def process_shipment_arrivals(self, week):
         """Process shipments that arrive this week"""
+        if self._ledger_loaded:
+            arrivals = self._zero_by_actor.copy()
+            arrivals.update(self._pending_arrivals.pop(week, {}))
+        else:
+            arrivals = self._query_federated_arrivals(week)
+        
+        if arrivals is not None:
+            for actor_name, total_arriving in arrivals.items():
+                if total_arriving > 0:
+                    print(f"   {actor_name}: {total_arriving} units arriving")
+            return arrivals
+        
+        # Federation unavailable: fall back to one query per repository
         arrivals = {}
         
-        for actor_name, config in self.supply_chain.items():
-            # Query shipments arriving this week (arrivalWeek is now an IRI)
-            query = f"""
+        # Total of shipments arriving this week (arrivalWeek is now an IRI)
+        # Most selective patterns (week, actor) lead each BGP in this file
+        queries = [
+            (f"""
                 PREFIX bg: <http://beergame.org/ontology#>
                 
-                SELECT ?shipment ?qty
+                SELECT (COALESCE(SUM(?qty), 0) AS ?total)
                 WHERE {{
-                    ?shipment a bg:Shipment ;
-                              bg:arrivalWeek bg:Week_{week} ;
-                              bg:quantity ?qty ;
-                              bg:shippedTo {config['uri']} .
+                    ?shipment bg:arrivalWeek bg:Week_{week} ;
+                              bg:shippedTo {config['uri']} ;
+                              a bg:Shipment ;
+                              bg:quantity ?qty .
                 }}
-            """
-            
-            results = self._execute_query(query, config['repo'])
+            """, config['repo'])
+            for config in self.supply_chain.values()
+        ]
+        all_results = self._execute_queries(queries)
+        
+        for actor_name, results in zip(self.supply_chain, all_results):
             bindings = results.get("results", {}).get("bindings", [])
             
-            total_arriving = sum(int(b["qty"]["value"]) for b in bindings)
+            # Summed server-side: a single row whatever the shipment count
+            total_arriving = int(bindings[0]["total"]["value"]) if bindings else 0
             arrivals[actor_name] = total_arriving
             
             if total_arriving > 0:
@@ -237,38 +330,134 @@ class BeerGameDynamicSimulation:
         
         return arrivals
     
+    def _load_stored_arrivals(self):
+        """Seed the arrivals ledger with every stored shipment, in one query"""
+        actor_values = " ".join(
+            f"(\"{actor_name}\" {config['uri']})"
+            for actor_name, config in self.supply_chain.items()
+        )
+        
+        query = f"""
+            {self.prefix_header}
+            
+            SELECT DISTINCT ?actor ?shipment ?arrival ?qty
+            WHERE {{
+                VALUES (?actor ?to) {{ {actor_values} }}
+                ?shipment bg:shippedTo ?to ;
+                          a bg:Shipment ;
+                          bg:arrivalWeek ?arrival ;
+                          bg:quantity ?qty .
+                # Older scripts wrote arrivalWeek as an xsd:integer literal
+                FILTER(isIRI(?arrival))
+            }}
+        """
+        
+        results = self._execute_query(query, FEDERATION_REPO)
+        # _execute_query's error fallback carries no "head": keep querying per week
+        if "head" not in results:
+            return False
+        
+        for b in results["results"]["bindings"]:
+            # Only bg:Week_N IRIs name a week this run can reach
+            week_suffix = b["arrival"]["value"].rsplit("Week_", 1)[-1]
+            if not week_suffix.isdigit():
+                continue
+            arrival_week = int(week_suffix)
+            actor_name = b["actor"]["value"]
+            qty = int(b["qty"]["value"])
+            
+            shipment = (b["shipment"]["value"], arrival_week, actor_name, qty)
+            if shipment in self._stored_shipments:
+                continue
+            self._stored_shipments.add(shipment)
+            
+            arriving = self._pending_arrivals.setdefault(arrival_week, {})
+            arriving[actor_name] = arriving.get(actor_name, 0) + qty
+        return True
+    
+    def _query_federated_arrivals(self, week):
+        """Total units arriving per actor, in one query over the federation"""
+        actor_values = " ".join(
+            f"(\"{actor_name}\" {config['uri']})"
+            for actor_name, config in self.supply_chain.items()
+        )
+        
+        query = f"""
+            {self.prefix_header}
+            
+            SELECT ?actor (SUM(?qty) AS ?total)
+            WHERE {{
+                VALUES (?actor ?to) {{ {actor_values} }}
+                {{
+                    SELECT DISTINCT ?shipment ?to ?qty
+                    WHERE {{
+                        ?shipment bg:arrivalWeek bg:Week_{week} ;
+                                  bg:shippedTo ?to ;
+                                  a bg:Shipment ;
+                                  bg:quantity ?qty .
+                    }}
+                }}
+            }}
+            GROUP BY ?actor
+        """
+        
+        results = self._execute_query(query, FEDERATION_REPO)
+        # _execute_query's error fallback carries no "head"
+        if "head" not in results:
+            return None
+        
+        arrivals = self._zero_by_actor.copy()
+        for b in results["results"]["bindings"]:
+            if "total" in b:
+                arrivals[b["actor"]["value"]] = int(b["total"]["value"])
+        return arrivals
+    
     def update_inventories(self, week, customer_demand, arrivals):
         """Update inventory levels for all actors"""
         inventories = {}
         
-        for actor_name, config in self.supply_chain.items():
-            repo = config['repo']
+        # Get current inventory from previous week: use the stock we wrote
+        # last week, and only query GraphDB for actors we have no record of
+        prev_week = week - 1
+        prev_stock = {}
+        if prev_week > 0:
+            missing = []
+            for actor_name, config in self.supply_chain.items():
+                cached = self._last_inventory.get(actor_name)
+                if cached and cached[0] == prev_week:
+                    prev_stock[actor_name] = cached[1]
+                else:
+                    missing.append((actor_name, config))
             
-            # Get current inventory from previous week
-            prev_week = week - 1
-            if prev_week > 0:
-                query = f"""
+            prev_results = self._execute_queries([
+                (f"""
                     PREFIX bg: <http://beergame.org/ontology#>
                     SELECT ?stock WHERE {{
-                        ?inv a bg:Inventory ;
-                             bg:forWeek bg:Week_{prev_week} ;
+                        ?inv bg:forWeek bg:Week_{prev_week} ;
                              bg:belongsTo {config['uri']} ;
+                             a bg:Inventory ;
                              bg:currentInventory ?stock .
                     }}
-                """
-                
-                result = self._execute_query(query, repo)
+                """, config['repo'])
+                for actor_name, config in missing
+            ])
+            
+            for (actor_name, config), result in zip(missing, prev_results):
                 bindings = result.get("results", {}).get("bindings", [])
                 
                 if bindings:
-                    current_stock = int(bindings[0]["stock"]["value"])
+                    prev_stock[actor_name] = int(bindings[0]["stock"]["value"])
                 else:
-                    current_stock = 12  # Default
-            else:
-                current_stock = 12  # Initial inventory
+                    prev_stock[actor_name] = 12  # Default
+        
+        for actor_name, config in self.supply_chain.items():
+            repo = config['repo']
+            
+            # Initial inventory is 12 in week 1
+            current_stock = prev_stock.get(actor_name, 12)
             
             # Calculate new stock
-            arrivals_qty = arrivals.get(actor_name, 0)
+            arrivals_qty = arrivals[actor_name]  # every actor has an entry
             
             # Retailer loses customer demand, others lose orders to downstream
             if actor_name == "Retailer":
@@ -282,28 +471,18 @@ class BeerGameDynamicSimulation:
             # Create new Inventory for this week
             inv_uri = f"{config['namespace']}:Inventory_Week{week}"
             
-            # Define namespace prefix for this actor
-            namespace_uri = f"http://beergame.org/{config['namespace'].replace('bg_', '')}#"
-            
-            update = f"""
-                PREFIX bg: <http://beergame.org/ontology#>
-                PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-                PREFIX {config['namespace']}: <{namespace_uri}>
-                
-                INSERT {{
+            triples = f"""
                     {inv_uri} a bg:Inventory ;
                         bg:forWeek bg:Week_{week} ;
                         bg:belongsTo {config['uri']} ;
                         bg:currentInventory "{new_stock}"^^xsd:integer ;
                         bg:backlog "0"^^xsd:integer ;
                         bg:holdingCost "0.5"^^xsd:decimal ;
-                        bg:backlogCost "1.0"^^xsd:decimal .
-                }}
-                WHERE {{}}
-            """
+                        bg:backlogCost "1.0"^^xsd:decimal ."""
             
-            self._execute_update(update, repo)
+            self._queue_triples(triples, repo)
             inventories[actor_name] = new_stock
+            self._last_inventory[actor_name] = (week, new_stock)
             print(f"   {actor_name}: {current_stock} + {arrivals_qty} - {demand_loss} = {new_stock}")
         
         return inventories
@@ -312,61 +491,85 @@ class BeerGameDynamicSimulation:
         """Process ordering decisions based on suggestedOrderQuantity"""
         orders = {}
         
-        for actor_name, config in self.supply_chain.items():
-            # Skip Factory (no upstream to order from)
-            if not config['upstream_actor']:
-                continue
-            
-            # Get suggested order quantity from ActorMetrics
-            query = f"""
-                PREFIX bg: <http://beergame.org/ontology#>
-                SELECT ?suggested WHERE {{
-                    ?metrics a bg:ActorMetrics ;
-                             bg:forWeek bg:Week_{week} ;
-                             bg:belongsTo {config['uri']} ;
-                             bg:suggestedOrderQuantity ?suggested .
-                }}
-            """
-            
-            result = self._execute_query(query, config['repo'])
-            bindings = result.get("results", {}).get("bindings", [])
-            
-            if bindings:
-                order_qty = int(bindings[0]["suggested"]["value"])
-            else:
-                order_qty = 4  # Default
+        # Skip Factory (no upstream to order from)
+        ordering = [
+            (actor_name, config)
+            for actor_name, config in self.supply_chain.items()
+            if config['upstream_actor']
+        ]
+        
+        # Get suggested order quantity from ActorMetrics: one federated
+        # query, or one query per repository if the federation is unavailable
+        suggested = self._query_federated_suggested(week, ordering)
+        if suggested is None:
+            suggested = {}
+            suggested_results = self._execute_queries([
+                (f"""
+                    PREFIX bg: <http://beergame.org/ontology#>
+                    SELECT ?suggested WHERE {{
+                        ?metrics bg:forWeek bg:Week_{week} ;
+                                 bg:belongsTo {config['uri']} ;
+                                 a bg:ActorMetrics ;
+                                 bg:suggestedOrderQuantity ?suggested .
+                    }}
+                """, config['repo'])
+                for actor_name, config in ordering
+            ])
+            for (actor_name, config), result in zip(ordering, suggested_results):
+                bindings = result.get("results", {}).get("bindings", [])
+                if bindings:
+                    suggested[actor_name] = int(bindings[0]["suggested"]["value"])
+        
+        for actor_name, config in ordering:
+            order_qty = suggested.get(actor_name, 4)  # Default 4
             
             # Create Order entity with receivedBy (upstream supplier)
             order_uri = f"{config['namespace']}:Order_Week{week}"
             
-            # Define namespace prefixes
-            actor_namespace_uri = f"http://beergame.org/{config['namespace'].replace('bg_', '')}#"
-            upstream_actor_name = config['upstream_actor']
-            upstream_config = self.supply_chain[upstream_actor_name]
-            upstream_namespace = upstream_config['namespace']
-            upstream_namespace_uri = f"http://beergame.org/{upstream_namespace.replace('bg_', '')}#"
-            
-            update = f"""
-                PREFIX bg: <http://beergame.org/ontology#>
-                PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-                PREFIX {config['namespace']}: <{actor_namespace_uri}>
-                PREFIX {upstream_namespace}: <{upstream_namespace_uri}>
-                
-                INSERT {{
+            triples = f"""
                     {order_uri} a bg:Order ;
                         bg:forWeek bg:Week_{week} ;
                         bg:placedBy {config['uri']} ;
                         bg:receivedBy {config['upstream_uri']} ;
-                        bg:orderQuantity "{order_qty}"^^xsd:integer .
-                }}
-                WHERE {{}}
-            """
-            self._execute_update(update, config['repo'])
+                        bg:orderQuantity "{order_qty}"^^xsd:integer ."""
+            self._queue_triples(triples, config['repo'])
             orders[actor_name] = order_qty
             print(f"   {actor_name} → {config['upstream_actor']}: {order_qty} units")
         
         return orders
     
+    def _query_federated_suggested(self, week, ordering):
+        """suggestedOrderQuantity per actor, in one query over the federation"""
+        actor_values = " ".join(
+            f"(\"{actor_name}\" {config['uri']})"
+            for actor_name, config in ordering
+        )
+        
+        query = f"""
+            {self.prefix_header}
+            
+            SELECT ?actor (SAMPLE(?suggested) AS ?qty)
+            WHERE {{
+                VALUES (?actor ?who) {{ {actor_values} }}
+                ?metrics bg:forWeek bg:Week_{week} ;
+                         bg:belongsTo ?who ;
+                         a bg:ActorMetrics ;
+                         bg:suggestedOrderQuantity ?suggested .
+            }}
+            GROUP BY ?actor
+        """
+        
+        results = self._execute_query(query, FEDERATION_REPO)
+        # _execute_query's error fallback carries no "head"
+        if "head" not in results:
+            return None
+        
+        return {
+            b["actor"]["value"]: int(b["qty"]["value"])
+            for b in results["results"]["bindings"]
+            if "qty" in b
+        }
+    
     def create_shipments(self, week, orders):
         """Create shipments that will arrive in future weeks"""
         shipments = {}
@@ -377,77 +580,65 @@ class BeerGameDynamicSimulation:
         for actor_name in chain_order:
             config = self.supply_chain[actor_name]
             
-            # Get actor's shipping delay
-            query = f"""
-                PREFIX bg: <http://beergame.org/ontology#>
-                SELECT ?delay WHERE {{
-                    {config['uri']} bg:shippingDelay ?delay .
-                }}
-            """
-            
-            result = self._execute_query(query, config['repo'])
-            bindings = result.get("results", {}).get("bindings", [])
-            
-            if bindings:
-                delay = int(bindings[0]["delay"]["value"])
-            else:
-                delay = 2
+            # Ships to the downstream actor based on its order
+            receiver_name = config['downstream_actor']
+            if receiver_name is None:  # Retailer ships to customer (not modeled)
+                continue
+            qty = orders.get(receiver_name, 4)
+            receiver_uri = self.supply_chain[receiver_name]["uri"]
             
+            delay = self._get_shipping_delay(actor_name)
             arrival_week_num = week + delay
             
-            # Determine quantity to ship and who receives it
-            if actor_name == "Factory":
-                # Ships to Distributor based on Distributor's order
-                qty = orders.get("Distributor", 4)
-                receiver_uri = self.supply_chain["Distributor"]["uri"]
-            elif actor_name == "Distributor":
-                qty = orders.get("Wholesaler", 4)
-                receiver_uri = self.supply_chain["Wholesaler"]["uri"]
-            elif actor_name == "Wholesaler":
-                qty = orders.get("Retailer", 4)
-                receiver_uri = self.supply_chain["Retailer"]["uri"]
-            else:  # Retailer ships to customer (not modeled)
-                continue
-            
             shipment_uri = f"{config['namespace']}:Shipment_Week{week}"
             
-            # Get receiver config for namespace
-            if actor_name == "Factory":
-                receiver_config = self.supply_chain["Distributor"]
-            elif actor_name == "Distributor":
-                receiver_config = self.supply_chain["Wholesaler"]
-            elif actor_name == "Wholesaler":
-                receiver_config = self.supply_chain["Retailer"]
-            else:
-                continue
-            
-            # Define namespace URIs
-            actor_namespace_uri = f"http://beergame.org/{config['namespace'].replace('bg_', '')}#"
-            receiver_namespace_uri = f"http://beergame.org/{receiver_config['namespace'].replace('bg_', '')}#"
-            
-            update = f"""
-                PREFIX bg: <http://beergame.org/ontology#>
-                PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-                PREFIX {config['namespace']}: <{actor_namespace_uri}>
-                PREFIX {receiver_config['namespace']}: <{receiver_namespace_uri}>
-                
-                INSERT {{
+            triples = f"""
                     {shipment_uri} a bg:Shipment ;
                         bg:forWeek bg:Week_{week} ;
                         bg:shippedFrom {config['uri']} ;
                         bg:shippedTo {receiver_uri} ;
                         bg:quantity "{qty}"^^xsd:integer ;
-                        bg:arrivalWeek bg:Week_{arrival_week_num} .
-                }}
-                WHERE {{}}
-            """
+                        bg:arrivalWeek bg:Week_{arrival_week_num} ."""
+            
+            self._queue_triples(triples, config['repo'])
+            
+            # Ledger entry so the arrival week needs no SPARQL lookup,
+            # unless the seed already counted this exact shipment
+            shipment = (f"{config['namespace_uri']}Shipment_Week{week}",
+                        arrival_week_num, receiver_name, qty)
+            if shipment not in self._stored_shipments:
+                arriving = self._pending_arrivals.setdefault(arrival_week_num, {})
+                arriving[receiver_name] = arriving.get(receiver_name, 0) + qty
             
-            self._execute_update(update, config['repo'])
             shipments[actor_name] = {"qty": qty, "arrival": arrival_week_num, "to": receiver_uri}
             print(f"   {actor_name}: ships {qty} units (arrives Week {arrival_week_num})")
         
         return shipments
     
+    def _get_shipping_delay(self, actor_name):
+        """Actor's shipping delay in weeks, queried once per run"""
+        if actor_name in self._shipping_delays:
+            return self._shipping_delays[actor_name]
+        
+        config = self.supply_chain[actor_name]
+        query = f"""
+            PREFIX bg: <http://beergame.org/ontology#>
+            SELECT ?delay WHERE {{
+                {config['uri']} bg:shippingDelay ?delay .
+            }}
+        """
+        
+        result = self._execute_query(query, config['repo'])
+        bindings = result.get("results", {}).get("bindings", [])
+        
+        if bindings:
+            delay = int(bindings[0]["delay"]["value"])
+        else:
+            delay = 2
+        
+        self._shipping_delays[actor_name] = delay
+        return delay
+    
     def _execute_query(self, sparql, repository):
         """Execute SPARQL SELECT query"""
         endpoint = f"{self.graphdb_url}/repositories/{repository}"
@@ -459,19 +650,25 @@ class BeerGameDynamicSimulation:
                 timeout=30
             )
             if response.status_code == 200:
+                if orjson is not None:
+                    return orjson.loads(response.content)
                 return response.json()
             return {"results": {"bindings": []}}
         except Exception as e:
             print(f"   ⚠️  Query error: {e}")
             return {"results": {"bindings": []}}
     
+    def _execute_queries(self, queries):
+        """Run (sparql, repository) SELECTs concurrently, results in input order"""
+        return list(self._pool.map(lambda q: self._execute_query(*q), queries))
+    
     def _execute_update(self, sparql, repository):
         """Execute SPARQL UPDATE query"""
         endpoint = f"{self.graphdb_url}/repositories/{repository}/statements"
         
-        # DEBUG: Print what we're trying to insert
-        print(f"\n   [DEBUG] Executing update on {repository}")
-        print(f"   [DEBUG] Query: {sparql}")  # Show the full SPARQL query
+        if self.verbose:
+            print(f"\n   [DEBUG] Executing update on {repository}")
+            print(f"   [DEBUG] Query: {sparql}")  # Show the full SPARQL query
         
         try:
             response = self.session.post(
@@ -481,37 +678,54 @@ class BeerGameDynamicSimulation:
                 timeout=30
             )
             
-            print(f"   [DEBUG] Response status: {response.status_code}")
+            if self.verbose:
+                print(f"   [DEBUG] Response status: {response.status_code}")
             if response.status_code != 204:
-                print(f"   [DEBUG] Error: {response.text}")
+                print(f"   ⚠️  Update failed on {repository}: {response.status_code}")
+                print(f"   Response: {response.text[:200]}")
                 
             return response.status_code == 204
         except Exception as e:
             print(f"   ⚠️  Update error: {e}")
             return False
     
+    def _queue_triples(self, triples, repository):
+        """Queue a triple block (prefixed names, no INSERT) for the next flush"""
+        self._pending_triples[repository].append(triples)
+    
+    def _flush_updates(self):
+        """Send queued triples as one INSERT per repository"""
+        for repository, triples in self._pending_triples.items():
+            # Use INSERT WHERE (not INSERT DATA); PREFIXes come from prefix_header
+            self._execute_update(
+                f"{self.prefix_header}\nINSERT {{" + "".join(triples) + "\n}\nWHERE {}",
+                repository
+            )
+        self._pending_triples.clear()
+    
     def generate_report(self):
         """Generate final simulation report"""
         print(f"\n{'='*80}")
         print(f"📊 SIMULATION REPORT")
         print(f"{'='*80}")
         
-        # Save to JSON
-        timestamp = self.start_time.strftime("%Y%m%d_%H%M%S")
-        filename = f"beer_game_dynamic_sim_{timestamp}.json"
+        # Weekly results are already in the .ndjson file; save the summary beside it
+        filename = f"{self.report_base}.meta.json"
         
         report = {
             "simulation": "Beer Game Dynamic Simulation",
             "start_time": self.start_time.isoformat(),
             "end_time": datetime.now().isoformat(),
-            "weeks": len(self.results),
-            "results": self.results
+            "weeks": self.weeks_simulated,
+            "seed": self.seed,
+            "results_file": f"{self.report_base}.ndjson"
         }
         
         with open(filename, 'w') as f:
             json.dump(report, f, indent=2)
         
         print(f"\n💾 Report saved: {filename}")
+        print(f"   Weekly results: {self.report_base}.ndjson")
         print(f"{'='*80}\n")
 
 
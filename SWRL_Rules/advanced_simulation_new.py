@@ -8,20 +8,33 @@ Simulates the beer game operational dynamics:
 - Delegates metrics & risks to temporal rules
 """
 
-import time
 import json
 import random
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from graphdb_session import make_session
 from temporal_beer_game_rules import TemporalBeerGameRuleExecutor
 
+# Federation repository spanning the four actor repositories
+FEDERATION_REPO = "BG_Supply_Chain"
+
+
+def _parse_int(value):
+    # Unit counts usually come back as plain integers; skip float() for those
+    if value.isdigit() or (value[:1] == "-" and value[1:].isdigit()):
+        return int(value)
+    return int(float(value))
+
 
 class BeerGameDynamicSimulation:
 
     def __init__(self, graphdb_url="http://localhost:7200"):
         self.graphdb_url = graphdb_url
-        self.session = requests.Session()
+
+        # Keep-alive pool sized for the per-actor worker threads
+        self.session = make_session(graphdb_url)
+
         self.rule_executor = TemporalBeerGameRuleExecutor(graphdb_url)
 
         # Actor chain (downstream → upstream)
@@ -48,40 +61,63 @@ class BeerGameDynamicSimulation:
             }
         }
 
+        # Prefix of the IRIs each actor's repo mints (run-invariant)
+        for cfg in self.actors.values():
+            cfg["repo_lc"] = cfg["repo"].lower()
+
         self.results = []
         self.start_time = None
 
+        # One worker per actor: per-actor requests hit independent repositories
+        self.pool = ThreadPoolExecutor(max_workers=len(self.actors))
+
+        # INSERT DATA operations queued per repo, sent by _flush_updates()
+        self.prefix_header = (
+            "PREFIX bg: <http://beergame.org/ontology#>\n"
+            "PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>"
+        )
+        self._pending_updates = {}
+
+        # Stock written by update_inventories, keyed by actor: (week, stock)
+        self._last_inventory = {}
+
     # ============================================================
     # MAIN SIMULATION LOOP
     # ============================================================
 
     def run_simulation(self, weeks=4, demand_pattern="stable"):
-        self.start_time = datetime.now()
+        try:
+            self.start_time = datetime.now()
 
-        print("\n" + "=" * 80)
-        print("🎮 BEER GAME DYNAMIC SIMULATION")
-        print("=" * 80)
-        print(f"   Demand pattern: {demand_pattern}")
-        print(f"   Weeks: {weeks}")
-        print("=" * 80)
+            print("\n" + "=" * 80)
+            print("🎮 BEER GAME DYNAMIC SIMULATION")
+            print("=" * 80)
+            print(f"   Demand pattern: {demand_pattern}")
+            print(f"   Weeks: {weeks}")
+            print("=" * 80)
+
+            self._warmup()
 
-        for week in range(1, weeks + 1):
-            print(f"\n{'#' * 80}")
-            print(f"📅 WEEK {week}")
-            print(f"{'#' * 80}")
+            for week in range(1, weeks + 1):
+                print(f"\n{'#' * 80}")
+                print(f"📅 WEEK {week}")
+                print(f"{'#' * 80}")
 
-            self.simulate_week(week, demand_pattern)
-            time.sleep(1)
+                self.simulate_week(week, demand_pattern)
 
-        self.generate_report()
+            self.generate_report()
+        finally:
+            self.pool.shutdown()
 
     def simulate_week(self, week, demand_pattern):
         self.generate_customer_demand(week, demand_pattern)
         self.process_shipment_arrivals(week)
         self.update_inventories(week)
+        self._flush_updates()  # rules read demand and inventories
         self.rule_executor.execute_federated_week_simulation(week, dry_run=False)
         self.process_orders(week)
         self.create_shipments(week)
+        self._flush_updates()
 
     # ============================================================
     # PHASE 1 – CUSTOMER DEMAND
@@ -102,16 +138,13 @@ class BeerGameDynamicSimulation:
         print(f"→ Customer demand: {demand} units")
 
         query = f"""
-        PREFIX bg: <http://beergame.org/ontology#>
-        PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-
         INSERT DATA {{
             bg_retailer:CustomerDemand_Week{week} a bg:CustomerDemand ;
                 bg:forWeek bg:Week_{week} ;
                 bg:actualDemand "{demand}"^^xsd:integer .
         }}
         """
-        self._execute_update(query, "BG_Retailer")
+        self._queue_update(query, "BG_Retailer")
 
     # ============================================================
     # PHASE 2 – SHIPMENT ARRIVALS (simplified)
@@ -127,36 +160,48 @@ class BeerGameDynamicSimulation:
     def update_inventories(self, week):
         print("→ Updating inventories")
 
-        for actor, cfg in self.actors.items():
-            repo = cfg["repo"]
-            actor_uri = cfg["uri"]
-
-            prev_week = week - 1
-            stock = 12
-
-            if prev_week > 0:
-                query = f"""
+        prev_week = week - 1
+        stocks = dict.fromkeys(self.actors, 12)
+
+        if prev_week > 0:
+            # Use the stock written last week; only query actors we have no record of
+            missing = []
+            for actor, cfg in self.actors.items():
+                cached = self._last_inventory.get(actor)
+                if cached and cached[0] == prev_week:
+                    stocks[actor] = cached[1]
+                else:
+                    missing.append(actor)
+
+            results = self._execute_queries([
+                (f"""
                 PREFIX bg: <http://beergame.org/ontology#>
                 SELECT ?s WHERE {{
                     ?i a bg:Inventory ;
                        bg:forWeek bg:Week_{prev_week} ;
-                       bg:belongsTo {actor_uri} ;
+                       bg:belongsTo {self.actors[actor]["uri"]} ;
                        bg:currentInventory ?s .
                 }}
-                """
-                res = self._execute_query(query, repo)
+                """, self.actors[actor]["repo"])
+                for actor in missing
+            ])
+            for actor, res in zip(missing, results):
                 if res["results"]["bindings"]:
-                    stock = int(res["results"]["bindings"][0]["s"]["value"])
+                    stocks[actor] = _parse_int(res["results"]["bindings"][0]["s"]["value"])
+
+        for actor, cfg in self.actors.items():
+            repo = cfg["repo"]
+            actor_uri = cfg["uri"]
+            stock = stocks[actor]
 
             if actor == "Retailer":
                 stock = max(0, stock - 4)
+            stocks[actor] = stock
+            self._last_inventory[actor] = (week, stock)
 
-            inventory_uri = f"{repo.lower()}:Inventory_Week{week}_{actor}"
+            inventory_uri = f"{cfg['repo_lc']}:Inventory_Week{week}_{actor}"
 
             update = f"""
-            PREFIX bg: <http://beergame.org/ontology#>
-            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-
             INSERT DATA {{
                 {inventory_uri} a bg:Inventory ;
                     bg:forWeek bg:Week_{week} ;
@@ -167,8 +212,9 @@ class BeerGameDynamicSimulation:
                     bg:backlogCost "1.0"^^xsd:decimal .
             }}
             """
-            self._execute_update(update, repo)
+            self._queue_update(update, repo)
 
+        for actor, stock in stocks.items():
             print(f"   {actor}: inventory = {stock}")
 
     # ============================================================
@@ -178,42 +224,81 @@ class BeerGameDynamicSimulation:
     def process_orders(self, week):
         print("→ Processing orders")
 
-        for actor, cfg in self.actors.items():
-            if not cfg["upstream"]:
-                continue
+        ordering = [(actor, cfg) for actor, cfg in self.actors.items() if cfg["upstream"]]
 
-            upstream = self.actors[cfg["upstream"]]
+        # One federated query; one query per repo if the federation fails
+        suggested = self._query_federated_suggested(week, ordering)
+        if suggested is None:
+            suggested = {}
+            results = self._execute_queries([
+                (f"""
+                PREFIX bg: <http://beergame.org/ontology#>
+                SELECT ?q WHERE {{
+                    ?m a bg:ActorMetrics ;
+                       bg:belongsTo {cfg['uri']} ;
+                       bg:forWeek bg:Week_{week} ;
+                       bg:suggestedOrderQuantity ?q .
+                }}
+                """, cfg["repo"])
+                for actor, cfg in ordering
+            ])
+            for (actor, cfg), res in zip(ordering, results):
+                if res["results"]["bindings"]:
+                    suggested[actor] = _parse_int(res["results"]["bindings"][0]["q"]["value"])
 
-            query = f"""
-            PREFIX bg: <http://beergame.org/ontology#>
-            SELECT ?q WHERE {{
-                ?m a bg:ActorMetrics ;
-                   bg:belongsTo {cfg['uri']} ;
-                   bg:forWeek bg:Week_{week} ;
-                   bg:suggestedOrderQuantity ?q .
-            }}
-            """
-            res = self._execute_query(query, cfg["repo"])
-            qty = int(float(res["results"]["bindings"][0]["q"]["value"])) if res["results"]["bindings"] else 4
+        quantities = {}
+        for actor, cfg in ordering:
+            upstream = self.actors[cfg["upstream"]]
+            qty = suggested.get(actor, 4)
 
-            order_uri = f"{cfg['repo'].lower()}:Order_Week{week}_{actor}"
+            order_uri = f"{cfg['repo_lc']}:Order_Week{week}_{actor}"
 
             update = f"""
-            PREFIX bg: <http://beergame.org/ontology#>
-            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-
             INSERT DATA {{
                 {order_uri} a bg:Order ;
                     bg:forWeek bg:Week_{week} ;
                     bg:placedBy {cfg['uri']} ;
                     bg:receivedBy {upstream['uri']} ;
-                    bg:orderQuantity "{qty}"^^xsd:decimal .
+                    bg:orderQuantity "{qty}"^^xsd:integer .
             }}
             """
-            self._execute_update(update, cfg["repo"])
+            self._queue_update(update, cfg["repo"])
+            quantities[actor] = qty
 
+        for actor, qty in quantities.items():
             print(f"   {actor} orders {qty} units")
 
+    def _query_federated_suggested(self, week, ordering):
+        # suggestedOrderQuantity per actor in one query over the federation
+        actor_values = " ".join(f'("{actor}" {cfg["uri"]})' for actor, cfg in ordering)
+
+        query = f"""
+        PREFIX bg: <http://beergame.org/ontology#>
+        PREFIX bg_retailer: <http://beergame.org/retailer#>
+        PREFIX bg_wholesaler: <http://beergame.org/wholesaler#>
+        PREFIX bg_distributor: <http://beergame.org/distributor#>
+        PREFIX bg_factory: <http://beergame.org/factory#>
+
+        SELECT ?actor (SAMPLE(?q) AS ?qty) WHERE {{
+            VALUES (?actor ?who) {{ {actor_values} }}
+            ?m bg:forWeek bg:Week_{week} ;
+               bg:belongsTo ?who ;
+               a bg:ActorMetrics ;
+               bg:suggestedOrderQuantity ?q .
+        }}
+        GROUP BY ?actor
+        """
+        res = self._execute_query(query, FEDERATION_REPO)
+        # _execute_query's error fallback carries no "head"
+        if "head" not in res:
+            return None
+
+        return {
+            b["actor"]["value"]: _parse_int(b["qty"]["value"])
+            for b in res["results"]["bindings"]
+            if "qty" in b
+        }
+
     # ============================================================
     # PHASE 5 – SHIPMENTS
     # ============================================================
@@ -228,22 +313,19 @@ class BeerGameDynamicSimulation:
             upstream = self.actors[cfg["upstream"]]
             arrival_week = week + 2
 
-            shipment_uri = f"{upstream['repo'].lower()}:Shipment_Week{week}_{actor}"
+            shipment_uri = f"{upstream['repo_lc']}:Shipment_Week{week}_{actor}"
 
             update = f"""
-            PREFIX bg: <http://beergame.org/ontology#>
-            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-
             INSERT DATA {{
                 {shipment_uri} a bg:Shipment ;
                     bg:forWeek bg:Week_{week} ;
                     bg:shippedFrom {upstream['uri']} ;
                     bg:shippedTo {cfg['uri']} ;
-                    bg:quantity "4"^^xsd:decimal ;
+                    bg:quantity "4"^^xsd:integer ;
                     bg:arrivalWeek "{arrival_week}"^^xsd:integer .
             }}
             """
-            self._execute_update(update, upstream["repo"])
+            self._queue_update(update, upstream["repo"])
 
     # ============================================================
     # GRAPHDB HELPERS
@@ -266,6 +348,30 @@ class BeerGameDynamicSimulation:
             headers={"Content-Type": "application/sparql-update"}
         )
 
+    def _execute_queries(self, queries):
+        # (sparql, repo) pairs run concurrently; results in input order
+        return list(self.pool.map(lambda q: self._execute_query(*q), queries))
+
+    def _execute_updates(self, updates):
+        # (sparql, repo) pairs run concurrently
+        list(self.pool.map(lambda u: self._execute_update(*u), updates))
+
+    def _warmup(self):
+        # Open one pooled connection per actor repo before Week 1
+        self._execute_queries([("ASK {}", cfg["repo"]) for cfg in self.actors.values()])
+
+    def _queue_update(self, sparql, repo):
+        # Queued without PREFIXes; sent with the next _flush_updates()
+        self._pending_updates.setdefault(repo, []).append(sparql)
+
+    def _flush_updates(self):
+        # One request per repo: ';'-separated operations share the PREFIXes
+        self._execute_updates([
+            (f"{self.prefix_header}\n" + " ;\n".join(updates), repo)
+            for repo, updates in self._pending_updates.items()
+        ])
+        self._pending_updates = {}
+
     # ============================================================
     # REPORT
     # ============================================================
@@ -18,6 +18,14 @@ except ImportError:
     print("  Make sure temporal_beer_game_rules.py is in the same directory")
     raise
 
+try:
+    import orjson  # Optional: faster per-week report serialization
+except ImportError:
+    orjson = None
+
+# Federation repository spanning the four actor repositories
+FEDERATION_REPO = "BG_Supply_Chain"
+
 
 class BeerGameDynamicSimulation:
     """
@@ -39,27 +47,33 @@ class BeerGameDynamicSimulation:
             "Retailer": {
                 "repo": "BG_Retailer",
                 "uri": "bg_retailer:Retailer_Alpha",
-                "upstream": "Wholesaler"
+                "upstream": "Wholesaler",
+                "downstream": None  # Ships to the customer
             },
             "Wholesaler": {
                 "repo": "BG_Whosaler",  # Keep typo
                 "uri": "bg_wholesaler:Wholesaler_Beta",
-                "upstream": "Distributor"
+                "upstream": "Distributor",
+                "downstream": "Retailer"
             },
             "Distributor": {
                 "repo": "BG_Distributor",
                 "uri": "bg_distributor:Distributor_Gamma",
-                "upstream": "Factory"
+                "upstream": "Factory",
+                "downstream": "Wholesaler"
             },
             "Factory": {
                 "repo": "BG_Factory",
                 "uri": "bg_factory:Factory_Delta",
-                "upstream": None  # No upstream
+                "upstream": None,  # No upstream
+                "downstream": "Distributor"
             }
         }
         
-        self.results = []
+        # Week results are streamed to <report_base>.ndjson, not kept in memory
+        self.weeks_simulated = 0
         self.start_time = None
+        self.report_base = None
         
     def run_simulation(self, weeks=4, demand_pattern="stable"):
         """
@@ -79,15 +93,24 @@ class BeerGameDynamicSimulation:
         print(f"   Demand pattern: {demand_pattern}")
         print(f"{'='*80}\n")
         
-        for week in range(1, weeks + 1):
-            print(f"\n{'#'*80}")
-            print(f"📅 WEEK {week} - SIMULATION STEP")
-            print(f"{'#'*80}")
-            
-            week_result = self.simulate_week(week, demand_pattern)
-            self.results.append(week_result)
-            
-            time.sleep(1)  # Brief pause
+        timestamp = self.start_time.strftime("%Y%m%d_%H%M%S")
+        self.report_base = f"beer_game_dynamic_sim_{timestamp}"
+        
+        # One JSON line per week, written as soon as the week completes
+        with open(f"{self.report_base}.ndjson", 'wb') as results_file:
+            for week in range(1, weeks + 1):
+                print(f"\n{'#'*80}")
+                print(f"📅 WEEK {week} - SIMULATION STEP")
+                print(f"{'#'*80}")
+                
+                week_result = self.simulate_week(week, demand_pattern)
+                if orjson is not None:
+                    results_file.write(orjson.dumps(week_result) + b"\n")
+                else:
+                    results_file.write(json.dumps(week_result, separators=(',', ':')).encode() + b"\n")
+                self.weeks_simulated += 1
+                
+                time.sleep(1)  # Brief pause
         
         self.generate_report()
     
@@ -168,29 +191,72 @@ class BeerGameDynamicSimulation:
     
     def process_shipment_arrivals(self, week):
         """Process shipments that arrive this week"""
+        arrivals = self._query_federated_arrivals(week)
+        if arrivals is not None:
+            return arrivals
+        
+        # Federation unavailable: query the repo of each actor's supplier
         arrivals = {}
         
         for actor_name, config in self.actors.items():
-            # Query shipments arriving this week
+            if not config['upstream']:  # Factory receives no shipments
+                arrivals[actor_name] = 0
+                continue
+            
             query = f"""
                 PREFIX bg: <http://beergame.org/ontology#>
+                PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
                 
                 SELECT ?shipment ?qty ?from
                 WHERE {{
-                    ?shipment a bg:Shipment ;
-                              bg:arrivalWeek "{week}"^^xsd:integer ;
+                    ?shipment bg:arrivalWeek "{week}"^^xsd:integer ;
+                              bg:shippedTo {config['uri']} ;
+                              a bg:Shipment ;
                               bg:quantity ?qty ;
                               bg:shippedFrom ?from .
-                    
-                    FILTER(CONTAINS(STR(?shipment), "{config['repo'].replace('BG_', '').lower()}"))
                 }}
             """
             
-            results = self._execute_query(query, config['repo'])
+            results = self._execute_query(query, self.actors[config['upstream']]['repo'])
             arrivals[actor_name] = len(results.get("results", {}).get("bindings", []))
         
         return arrivals
     
+    def _query_federated_arrivals(self, week):
+        """Shipments arriving per actor, in one query over the federation"""
+        actor_values = " ".join(
+            f"(\"{actor_name}\" {config['uri']})"
+            for actor_name, config in self.actors.items()
+        )
+        
+        query = f"""
+            PREFIX bg: <http://beergame.org/ontology#>
+            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+            PREFIX bg_retailer: <http://beergame.org/retailer#>
+            PREFIX bg_wholesaler: <http://beergame.org/wholesaler#>
+            PREFIX bg_distributor: <http://beergame.org/distributor#>
+            PREFIX bg_factory: <http://beergame.org/factory#>
+            
+            SELECT ?actor (COUNT(DISTINCT ?shipment) AS ?n)
+            WHERE {{
+                VALUES (?actor ?to) {{ {actor_values} }}
+                ?shipment bg:arrivalWeek "{week}"^^xsd:integer ;
+                          bg:shippedTo ?to ;
+                          a bg:Shipment .
+            }}
+            GROUP BY ?actor
+        """
+        
+        results = self._execute_query(query, FEDERATION_REPO)
+        # _execute_query's error fallback carries no "head"
+        if "head" not in results:
+            return None
+        
+        arrivals = dict.fromkeys(self.actors, 0)
+        for b in results["results"]["bindings"]:
+            arrivals[b["actor"]["value"]] = int(b["n"]["value"])
+        return arrivals
+    
     def update_inventories(self, week, customer_demand):
         """Update inventory levels for all actors"""
         inventories = {}
@@ -320,6 +386,12 @@ class BeerGameDynamicSimulation:
             qty = 4
             
             shipment_uri = f"{config['repo'].lower()}:Shipment_Week{week}"
+            
+            # Receiver as a typed triple, so arrivals match it by index
+            shipped_to = ""
+            if config['downstream']:
+                shipped_to = f"bg:shippedTo {self.actors[config['downstream']]['uri']} ;"
+            
             update = f"""
                 PREFIX bg: <http://beergame.org/ontology#>
                 PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
@@ -328,6 +400,7 @@ class BeerGameDynamicSimulation:
                     {shipment_uri} a bg:Shipment ;
                         bg:forWeek bg:Week_{week} ;
                         bg:shippedFrom {config['uri']} ;
+                        {shipped_to}
                         bg:quantity "{qty}"^^xsd:integer ;
                         bg:arrivalWeek "{arrival_week}"^^xsd:integer .
                 }}
@@ -376,22 +449,22 @@ class BeerGameDynamicSimulation:
         print(f"📊 SIMULATION REPORT")
         print(f"{'='*80}")
         
-        # Save to JSON
-        timestamp = self.start_time.strftime("%Y%m%d_%H%M%S")
-        filename = f"beer_game_dynamic_sim_{timestamp}.json"
+        # Weekly results are already in the .ndjson file; save the summary beside it
+        filename = f"{self.report_base}.meta.json"
         
         report = {
             "simulation": "Beer Game Dynamic Simulation",
             "start_time": self.start_time.isoformat(),
             "end_time": datetime.now().isoformat(),
-            "weeks": len(self.results),
-            "results": self.results
+            "weeks": self.weeks_simulated,
+            "results_file": f"{self.report_base}.ndjson"
         }
         
         with open(filename, 'w') as f:
             json.dump(report, f, indent=2)
         
         print(f"\n💾 Report saved: {filename}")
+        print(f"   Weekly results: {self.report_base}.ndjson")
         print(f"{'='*80}\n")
 
 
@@ -21,8 +21,57 @@ Separation of Concerns:
 import requests
 import random
 import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from graphdb_session import make_session
 from temporal_beer_game_rules_v3 import TemporalBeerGameRuleExecutor
 
+try:
+    import orjson  # Optional: faster JSON parsing and report serialization
+except ImportError:
+    orjson = None
+
+# Max number of SELECT results kept by the orchestrator's query cache
+QUERY_CACHE_SIZE = 16
+
+# Pause between weeks as a fraction of the last query's latency,
+# skipped entirely when it comes out shorter than INTER_WEEK_MIN_DELAY
+INTER_WEEK_DELAY_FACTOR = 0.1
+INTER_WEEK_MIN_DELAY = 0.01  # seconds
+
+EXISTING_WEEKS_QUERY = """
+    PREFIX bg: <http://beergame.org/ontology#>
+    
+    SELECT DISTINCT ?weekNum
+    WHERE {
+        ?week a bg:Week ;
+              bg:weekNumber ?weekNum .
+    }
+    ORDER BY ?weekNum
+"""
+
+SPARQL_JSON_HEADERS = {"Accept": "application/sparql-results+json"}
+
+# Cheap query sent once before Week 1 so GraphDB's caches are warm
+WARMUP_QUERY = "ASK { ?s ?p ?o }"
+FEDERATION_REPO = "BG_Supply_Chain"
+
+# Week summary fields: (summary key, SPARQL variable, cast, default if unbound)
+WEEK_SUMMARY_FIELDS = (
+    ("inventory", "inv", int, 0),
+    ("backlog", "backlog", int, 0),
+    ("coverage", "coverage", float, 0.0),
+    ("suggested_order", "suggested", int, 0),
+    ("total_cost", "cost", float, 0.0),
+    ("demand_rate", "demandRate", float, 0.0),
+    ("bullwhip_risk", "bullwhip", lambda v: v.lower() == "true", False),
+    ("stockout_risk", "stockout", lambda v: v.lower() == "true", False),
+    ("orders_placed", "ordersPlaced", int, 0),
+    ("orders_received", "ordersReceived", int, 0),
+    ("shipments_created", "shipmentsCreated", int, 0),
+)
+
 
 class BeerGameOrchestrator:
     """
@@ -42,7 +91,9 @@ class BeerGameOrchestrator:
     
     def __init__(self, base_url="http://localhost:7200"):
         self.base_url = base_url
-        self.session = requests.Session()
+        
+        # One keep-alive session for every GraphDB call (pooled connections)
+        self.session = make_session(base_url)
         
         # Supply chain configuration
         self.supply_chain = {
@@ -68,36 +119,85 @@ class BeerGameOrchestrator:
             }
         }
         
-        # Rule executor
-        self.rule_executor = TemporalBeerGameRuleExecutor(base_url)
+        # Full namespace IRI per actor (run-invariant)
+        for config in self.supply_chain.values():
+            config['namespace_uri'] = f"http://beergame.org/{config['namespace'][3:]}#"
+        
+        # Report metadata for the chain (static, built once)
+        self.report_supply_chain = {
+            actor: {
+                "uri": config['uri'],
+                "repository": config['repo']
+            }
+            for actor, config in self.supply_chain.items()
+        }
+        
+        # Rule executor (shares the pooled session above)
+        self.rule_executor = TemporalBeerGameRuleExecutor(base_url, session=self.session)
         
         # Results tracking
         self.results = []
+        
+        # SELECT result cache keyed on (repository, query, epoch).
+        # The epoch is bumped on every write (ours or the rule executor's),
+        # so a hit is only possible while the KG is unchanged.
+        self._query_cache = OrderedDict()
+        self._kg_epoch = 0
+        self._cache_lock = threading.Lock()  # pool workers share the cache
+        
+        # One worker per actor for the per-actor SELECTs
+        self._pool = ThreadPoolExecutor(max_workers=len(self.supply_chain))
+        
+        # Latency of the last SELECT sent to GraphDB (seconds)
+        self._last_query_s = 0.0
+        
+        # UPDATE operations queued per repository, sent by flush_updates()
+        self._pending_updates = {}
     
     def _execute_query(self, query, repository):
         """Execute SPARQL SELECT query"""
+        key = (repository, query, self._kg_epoch)
+        with self._cache_lock:
+            if key in self._query_cache:
+                self._query_cache.move_to_end(key)
+                return self._query_cache[key]
+        
         endpoint = f"{self.base_url}/repositories/{repository}"
-        headers = {"Accept": "application/sparql-results+json"}
         
         try:
+            started = time.perf_counter()
             response = self.session.post(
                 endpoint,
                 data={"query": query},
-                headers=headers,
+                headers=SPARQL_JSON_HEADERS,
                 timeout=30
             )
+            self._last_query_s = time.perf_counter() - started
             
             if response.status_code == 200:
-                return response.json()
+                if orjson is not None:
+                    result = orjson.loads(response.content)
+                else:
+                    result = response.json()
+                with self._cache_lock:
+                    self._query_cache[key] = result
+                    if len(self._query_cache) > QUERY_CACHE_SIZE:
+                        self._query_cache.popitem(last=False)
+                return result
             else:
                 print(f"Query error: {response.status_code}")
                 return {}
-        except Exception as e:
+        except (requests.RequestException, ValueError) as e:
             print(f"Query exception: {e}")
             return {}
     
+    def _execute_queries(self, queries):
+        """Run (sparql, repository) SELECTs concurrently, results in input order"""
+        return list(self._pool.map(lambda q: self._execute_query(*q), queries))
+    
     def _execute_update(self, update, repository):
         """Execute SPARQL UPDATE query"""
+        self._kg_epoch += 1
         endpoint = f"{self.base_url}/repositories/{repository}/statements"
         headers = {"Content-Type": "application/sparql-update"}
         
@@ -120,6 +220,16 @@ class BeerGameOrchestrator:
             traceback.print_exc()
             return False
     
+    def _queue_update(self, update, repository):
+        """Buffer SPARQL UPDATE; sent with the next flush_updates()"""
+        self._pending_updates.setdefault(repository, []).append(update)
+    
+    def flush_updates(self):
+        """Send buffered updates, one ';'-separated request per repository"""
+        for repository, updates in self._pending_updates.items():
+            self._execute_update(" ;\n".join(updates), repository)
+        self._pending_updates = {}
+    
     # NOTE: create_week_entity, create_actor_metrics_snapshot, and
     # create_inventory_snapshot are now called from rule_executor
     # This maintains separation: orchestrator delegates structure creation
@@ -156,7 +266,7 @@ class BeerGameOrchestrator:
             PREFIX bg: <http://beergame.org/ontology#>
             PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
             PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            PREFIX {config['namespace']}: <http://beergame.org/{config['namespace'].replace('bg_', '')}#>
+            PREFIX {config['namespace']}: <{config['namespace_uri']}>
             
             DELETE {{
                 {config['namespace']}:CustomerDemand_Week{week} bg:actualDemand ?oldDemand ;
@@ -179,9 +289,12 @@ class BeerGameOrchestrator:
             }}
         """
         
-        self._execute_update(update, config['repo'])
+        self._queue_update(update, config['repo'])
         print(f"      Customer demand: {demand} units")
         
+        # Sent together with the week structure queued in simulate_week
+        self.flush_updates()
+        
         # Verify it was created
         verify_query = f"""
             PREFIX bg: <http://beergame.org/ontology#>
@@ -202,109 +315,145 @@ class BeerGameOrchestrator:
         
         return demand
     
-    def get_week_summary(self, week):
-        """Read results computed by rules - comprehensive metrics"""
-        print(f"\n📊 WEEK {week} SUMMARY:")
-        print("="*60)
-        
-        summary = {}
-        
-        for actor_name, config in self.supply_chain.items():
-            query = f"""
-                PREFIX bg: <http://beergame.org/ontology#>
-                PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    def _week_summary_query(self, week, actor_uris):
+        """Week summary SELECT for the given actors, one row per actor"""
+        actor_values = " ".join(f"<{uri}>" for uri in actor_uris)
+        return f"""
+            PREFIX bg: <http://beergame.org/ontology#>
+            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+            
+            SELECT ?actor ?inv ?backlog ?coverage ?suggested ?cost 
+                   ?demandRate ?bullwhip ?stockout
+                   ?ordersPlaced ?ordersReceived ?shipmentsCreated
+            WHERE {{
+                VALUES ?actor {{ {actor_values} }}
                 
-                SELECT ?inv ?backlog ?coverage ?suggested ?cost 
-                       ?demandRate ?bullwhip ?stockout
-                       (COUNT(DISTINCT ?orderPlaced) as ?ordersPlaced)
-                       (COUNT(DISTINCT ?orderReceived) as ?ordersReceived)
-                       (COUNT(DISTINCT ?shipment) as ?shipmentsCreated)
-                WHERE {{
-                    # Get inventory
-                    OPTIONAL {{
-                        ?invEntity a bg:Inventory ;
-                                   bg:forWeek bg:Week_{week} ;
-                                   bg:belongsTo <{config['uri']}> ;
-                                   bg:currentInventory ?inv ;
-                                   bg:backlog ?backlog .
-                    }}
-                    
-                    # Get metrics
-                    OPTIONAL {{
-                        <{config['uri']}> bg:hasMetrics ?metrics .
-                        ?metrics bg:forWeek bg:Week_{week} ;
-                                 bg:inventoryCoverage ?coverage ;
-                                 bg:suggestedOrderQuantity ?suggested ;
-                                 bg:demandRate ?demandRate ;
-                                 bg:hasBullwhipRisk ?bullwhip ;
-                                 bg:hasStockoutRisk ?stockout .
-                    }}
-                    
-                    # Get total cost
-                    OPTIONAL {{
-                        <{config['uri']}> bg:totalCost ?cost .
-                    }}
-                    
-                    # Count orders PLACED by this actor (outgoing)
-                    OPTIONAL {{
+                # Get inventory
+                OPTIONAL {{
+                    ?invEntity a bg:Inventory ;
+                               bg:forWeek bg:Week_{week} ;
+                               bg:belongsTo ?actor ;
+                               bg:currentInventory ?inv ;
+                               bg:backlog ?backlog .
+                }}
+                
+                # Get metrics
+                OPTIONAL {{
+                    ?actor bg:hasMetrics ?metrics .
+                    ?metrics bg:forWeek bg:Week_{week} ;
+                             bg:inventoryCoverage ?coverage ;
+                             bg:suggestedOrderQuantity ?suggested ;
+                             bg:demandRate ?demandRate ;
+                             bg:hasBullwhipRisk ?bullwhip ;
+                             bg:hasStockoutRisk ?stockout .
+                }}
+                
+                # Get total cost
+                OPTIONAL {{
+                    ?actor bg:totalCost ?cost .
+                }}
+                
+                # Counts are separate sub-SELECTs grouped by actor so the three
+                # patterns are not multiplied into a cross product; an actor
+                # with nothing to count is left unbound (read as 0)
+                
+                # Count orders PLACED by this actor (outgoing)
+                OPTIONAL {{
+                    SELECT ?actor (COUNT(DISTINCT ?orderPlaced) as ?ordersPlaced)
+                    WHERE {{
                         ?orderPlaced a bg:Order ;
                                bg:forWeek bg:Week_{week} ;
-                               bg:placedBy <{config['uri']}> .
+                               bg:placedBy ?actor .
                     }}
-                    
-                    # Count orders RECEIVED by this actor (incoming/propagated)
-                    OPTIONAL {{
+                    GROUP BY ?actor
+                }}
+                
+                # Count orders RECEIVED by this actor (incoming)
+                OPTIONAL {{
+                    SELECT ?actor (COUNT(DISTINCT ?orderReceived) as ?ordersReceived)
+                    WHERE {{
                         ?orderReceived a bg:Order ;
                                        bg:forWeek bg:Week_{week} ;
-                                       bg:receivedBy <{config['uri']}> .
+                                       bg:receivedBy ?actor .
                     }}
-                    
-                    # Count shipments sent this week
-                    OPTIONAL {{
+                    GROUP BY ?actor
+                }}
+                
+                # Count shipments sent this week
+                OPTIONAL {{
+                    SELECT ?actor (COUNT(DISTINCT ?shipment) as ?shipmentsCreated)
+                    WHERE {{
                         ?shipment a bg:Shipment ;
                                   bg:forWeek bg:Week_{week} ;
-                                  bg:shippedFrom <{config['uri']}> .
+                                  bg:shippedFrom ?actor .
                     }}
+                    GROUP BY ?actor
                 }}
-                GROUP BY ?inv ?backlog ?coverage ?suggested ?cost ?demandRate ?bullwhip ?stockout
-            """
-            
-            result = self._execute_query(query, config['repo'])
-            bindings = result.get("results", {}).get("bindings", [])
+            }}
+        """
+    
+    def _query_week_summary_rows(self, week):
+        """
+        First result row per actor URI for the week summary
+        
+        Reads all four actors with one query on the federation and falls
+        back to one query per actor repository if that fails
+        """
+        actor_uris = [config['uri'] for config in self.supply_chain.values()]
+        result = self._execute_query(self._week_summary_query(week, actor_uris), FEDERATION_REPO)
+        
+        if not result:
+            result = {"results": {"bindings": []}}
+            actor_results = self._execute_queries([
+                (self._week_summary_query(week, [uri]), config['repo'])
+                for uri, config in zip(actor_uris, self.supply_chain.values())
+            ])
+            for actor_result in actor_results:
+                result["results"]["bindings"] += actor_result.get("results", {}).get("bindings", [])
+        
+        rows = {}
+        for b in result.get("results", {}).get("bindings", []):
+            rows.setdefault(b["actor"]["value"], b)
+        return rows
+    
+    def get_week_summary(self, week):
+        """Read results computed by rules - comprehensive metrics"""
+        print(f"\n📊 WEEK {week} SUMMARY:")
+        print("="*60)
+        
+        summary = {}
+        rows = self._query_week_summary_rows(week)
+        
+        for actor_name, config in self.supply_chain.items():
+            b = rows.get(config['uri'])
             
-            if bindings:
-                b = bindings[0]
+            if b:
                 actor_data = {
-                    "inventory": int(b.get("inv", {}).get("value", 0)),
-                    "backlog": int(b.get("backlog", {}).get("value", 0)),
-                    "coverage": float(b.get("coverage", {}).get("value", 0.0)),
-                    "suggested_order": int(b.get("suggested", {}).get("value", 0)),
-                    "total_cost": float(b.get("cost", {}).get("value", 0.0)),
-                    "demand_rate": float(b.get("demandRate", {}).get("value", 0.0)),
-                    "bullwhip_risk": b.get("bullwhip", {}).get("value", "false").lower() == "true",
-                    "stockout_risk": b.get("stockout", {}).get("value", "false").lower() == "true",
-                    "orders_placed": int(b.get("ordersPlaced", {}).get("value", 0)),
-                    "orders_received": int(b.get("ordersReceived", {}).get("value", 0)),
-                    "shipments_created": int(b.get("shipmentsCreated", {}).get("value", 0))
+                    key: cast(b[var]["value"]) if var in b else default
+                    for key, var, cast, default in WEEK_SUMMARY_FIELDS
                 }
                 summary[actor_name] = actor_data
                 
-                print(f"  {actor_name}:")
-                print(f"    Inventory: {actor_data['inventory']}")
-                print(f"    Backlog: {actor_data['backlog']}")
-                print(f"    Coverage: {actor_data['coverage']:.1f} weeks")
-                print(f"    Demand rate: {actor_data['demand_rate']:.1f}")
-                print(f"    Suggested order: {actor_data['suggested_order']}")
-                print(f"    Orders placed: {actor_data['orders_placed']} | received: {actor_data['orders_received']}")
-                print(f"    Shipments created: {actor_data['shipments_created']}")
+                # Collect the actor block and write it with a single print
+                lines = [
+                    f"  {actor_name}:",
+                    f"    Inventory: {actor_data['inventory']}",
+                    f"    Backlog: {actor_data['backlog']}",
+                    f"    Coverage: {actor_data['coverage']:.1f} weeks",
+                    f"    Demand rate: {actor_data['demand_rate']:.1f}",
+                    f"    Suggested order: {actor_data['suggested_order']}",
+                    f"    Orders placed: {actor_data['orders_placed']} | received: {actor_data['orders_received']}",
+                    f"    Shipments created: {actor_data['shipments_created']}",
+                ]
                 
                 # Show warnings
                 if actor_data['bullwhip_risk']:
-                    print(f"    ⚠️  BULLWHIP RISK DETECTED")
+                    lines.append(f"    ⚠️  BULLWHIP RISK DETECTED")
                 if actor_data['stockout_risk']:
-                    print(f"    ⚠️  STOCKOUT RISK DETECTED")
+                    lines.append(f"    ⚠️  STOCKOUT RISK DETECTED")
                     
-                print(f"    Total cost: ${actor_data['total_cost']:.2f}")
+                lines.append(f"    Total cost: ${actor_data['total_cost']:.2f}")
+                print("\n".join(lines))
         
         print("="*60)
         return summary
@@ -341,14 +490,13 @@ class BeerGameOrchestrator:
         print(f"📅 WEEK {week} - SIMULATION (V3 - Federated)")
         print(f"{'#'*80}")
         
-        # Step 1: Create temporal structure
+        # Step 1: Create temporal structure (queued, sent with the demand)
         print(f"\n🏗️  Creating temporal structure...")
-        self.rule_executor.create_week_entity(week)
-        
         # Only create ActorMetrics for Week > 1 (Week 1 is in initial TTL)
-        if week > 1:
-            self.rule_executor.create_actor_metrics_snapshot(week)
-            self.rule_executor.create_inventory_snapshot(week)
+        structure = self.rule_executor.week_structure_updates(week, snapshots=week > 1)
+        for repo, update in structure:
+            self._queue_update(update, repo)
+        print(f"   Queued {len(structure)} Week_{week} structure updates")
         
         # Step 2: Generate external event
         demand = self.generate_customer_demand(week, demand_pattern)
@@ -357,6 +505,7 @@ class BeerGameOrchestrator:
         print(f"\n   Executing business rules (V3 - with federation)...")
         repos = [config['repo'] for config in self.supply_chain.values()]
         self.rule_executor.execute_week_rules(week, repos)
+        self._kg_epoch += 1
         
         # V3: No manual propagation needed!
         # - UPDATE INVENTORY queries BG_Supply_Chain for arriving shipments
@@ -379,24 +528,14 @@ class BeerGameOrchestrator:
         # Query any repository (they all have the same weeks)
         repo = list(self.supply_chain.values())[0]['repo']
         
-        query = """
-            PREFIX bg: <http://beergame.org/ontology#>
-            
-            SELECT DISTINCT ?weekNum
-            WHERE {
-                ?week a bg:Week ;
-                      bg:weekNumber ?weekNum .
-            }
-            ORDER BY ?weekNum
-        """
-        
         endpoint = f"{self.base_url}/repositories/{repo}"
         
         try:
-            response = requests.post(
+            # GET with a constant query string: identical URL on every run
+            response = self.session.get(
                 endpoint,
-                data={"query": query},
-                headers={"Accept": "application/sparql-results+json"},
+                params={"query": EXISTING_WEEKS_QUERY},
+                headers=SPARQL_JSON_HEADERS,
                 timeout=10
             )
             
@@ -419,44 +558,77 @@ class BeerGameOrchestrator:
             print(f"   ⚠️  Error checking existing weeks: {e}")
             return []
     
-    def run_simulation(self, weeks=4, demand_pattern="stable"):
-        """Run multi-week simulation (incremental - only simulates new weeks)"""
-        
-        # Check which weeks already exist
-        existing_weeks = self.get_existing_weeks()
-        max_existing = max(existing_weeks) if existing_weeks else 0
+    def _warmup(self):
+        """Prime the federation repository before the first week"""
+        endpoint = f"{self.base_url}/repositories/{FEDERATION_REPO}"
         
-        if max_existing >= weeks:
-            print(f"\n⚠️  Weeks 1-{weeks} already simulated (max existing: {max_existing})")
-            print(f"   To re-simulate, run clean_temporal_data.py first")
-            print(f"   Or specify more weeks (e.g., {max_existing + 1}+)")
-            return
-        
-        start_week = max_existing + 1
+        try:
+            started = time.perf_counter()
+            response = self.session.get(
+                endpoint,
+                params={"query": WARMUP_QUERY},
+                headers=SPARQL_JSON_HEADERS,
+                timeout=30
+            )
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            
+            if response.status_code == 200:
+                print(f"   GraphDB warm-up ({FEDERATION_REPO}): {elapsed_ms:.0f} ms")
+            else:
+                print(f"   ⚠️  Warm-up query failed: {response.status_code}")
         
-        print(f"\n{'='*80}")
-        print(f"🎮 BEER GAME SIMULATION - WEEKS {start_week} TO {weeks}")
-        if start_week > 1:
-            print(f"   Resuming from Week {start_week} (Weeks 1-{max_existing} already exist)")
-        print(f"   Demand Pattern: {demand_pattern}")
-        print(f"{'='*80}")
+        except Exception as e:
+            print(f"   ⚠️  Warm-up error: {e}")
+    
+    def run_simulation(self, weeks=4, demand_pattern="stable"):
+        """Run multi-week simulation (incremental - only simulates new weeks)"""
         
-        for week in range(start_week, weeks + 1):
-            result = self.simulate_week(week, demand_pattern)
-            result['demand_pattern'] = demand_pattern  # Add pattern to result
-            self.results.append(result)
+        try:
+            # Check which weeks already exist
+            existing_weeks = self.get_existing_weeks()
+            max_existing = max(existing_weeks) if existing_weeks else 0
             
-            if week < weeks:
-                time.sleep(1)
-        # V3.1 NEW: Post-mortem analysis
-        analyze_decision_outcomes(
-            self.session, 
-            weeks, 
-            self.supply_chain,
-            self.base_url
-        )
-        
-        self.generate_final_report()
+            if max_existing >= weeks:
+                print(f"\n⚠️  Weeks 1-{weeks} already simulated (max existing: {max_existing})")
+                print(f"   To re-simulate, run clean_temporal_data.py first")
+                print(f"   Or specify more weeks (e.g., {max_existing + 1}+)")
+                return
+            
+            start_week = max_existing + 1
+            
+            print(f"\n{'='*80}")
+            print(f"🎮 BEER GAME SIMULATION - WEEKS {start_week} TO {weeks}")
+            if start_week > 1:
+                print(f"   Resuming from Week {start_week} (Weeks 1-{max_existing} already exist)")
+            print(f"   Demand Pattern: {demand_pattern}")
+            print(f"{'='*80}")
+            
+            self._warmup()
+            
+            for week in range(start_week, weeks + 1):
+                result = self.simulate_week(week, demand_pattern)
+                result['demand_pattern'] = demand_pattern  # Add pattern to result
+                self.results.append(result)
+            
+                # Back off in proportion to how slow GraphDB has been
+                # answering, instead of a fixed pause after every week
+                if week < weeks:
+                    delay = self._last_query_s * INTER_WEEK_DELAY_FACTOR
+                    if delay > INTER_WEEK_MIN_DELAY:
+                        time.sleep(delay)
+            
+            # V3.1 NEW: Post-mortem analysis
+            analyze_decision_outcomes(
+                self.session, 
+                weeks, 
+                self.supply_chain,
+                self.base_url
+            )
+            
+            self.generate_final_report()
+        finally:
+            self._pool.shutdown()
+            self.session.close()
     
     def generate_final_report(self):
         """Generate final simulation report with rich data"""
@@ -468,13 +640,14 @@ class BeerGameOrchestrator:
             print("No results to report")
             return
         
-        print(f"\nTotal weeks simulated: {len(self.results)}")
+        n = len(self.results)
+        final_week = self.results[-1]
+        print(f"\nTotal weeks simulated: {n}")
         
         # Calculate total costs
         print("\n💰 TOTAL COSTS:")
         final_costs = {}
         for actor_name in self.supply_chain.keys():
-            final_week = self.results[-1]
             if actor_name in final_week['summary']:
                 cost = final_week['summary'][actor_name]['total_cost']
                 final_costs[actor_name] = cost
@@ -486,8 +659,14 @@ class BeerGameOrchestrator:
         import json
         from datetime import datetime
         
-        # Build detailed weekly data
+        # Single wall-clock reading for both the ISO date and the file name
+        report_time = datetime.now()
+        
+        # Build detailed weekly data and the performance aggregates in one pass
         weekly_details = []
+        weeks_without_backlog = 0
+        total_inv = 0
+        inv_count = 0
         for result in self.results:
             week_data = {
                 "week": result['week'],
@@ -509,21 +688,26 @@ class BeerGameOrchestrator:
                     "stockout_risk": actor_summary['stockout_risk'],
                     "total_cost": actor_summary['total_cost']
                 }
+                total_inv += actor_summary['inventory']
+                inv_count += 1
+            
+            retailer = result['summary'].get("Retailer")
+            if retailer is not None and retailer['backlog'] == 0:
+                weeks_without_backlog += 1
             
             weekly_details.append(week_data)
         
+        total_backlog = sum(
+            actor_summary['backlog']
+            for actor_summary in final_week['summary'].values()
+        )
+        
         report = {
             "metadata": {
-                "simulation_date": datetime.now().isoformat(),
-                "weeks_simulated": len(self.results),
-                "demand_pattern": self.results[0].get('demand_pattern', 'unknown') if self.results else None,
-                "supply_chain": {
-                    actor: {
-                        "uri": config['uri'],
-                        "repository": config['repo']
-                    }
-                    for actor, config in self.supply_chain.items()
-                }
+                "simulation_date": report_time.isoformat(),
+                "weeks_simulated": n,
+                "demand_pattern": self.results[0].get('demand_pattern', 'unknown'),
+                "supply_chain": self.report_supply_chain
             },
             "simulation": {
                 "weekly_results": weekly_details,
@@ -531,56 +715,24 @@ class BeerGameOrchestrator:
                 "total_cost": sum(final_costs.values())
             },
             "performance": {
-                "retailer_service_level": self._calculate_service_level("Retailer"),
-                "average_inventory": self._calculate_avg_inventory(),
-                "total_backlog": self._calculate_total_backlog()
+                "retailer_service_level": weeks_without_backlog / n,
+                "average_inventory": total_inv / inv_count if inv_count > 0 else 0.0,
+                "total_backlog": total_backlog
             }
         }
         
-        report_file = f"beer_game_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        report_file = f"beer_game_report_{report_time.strftime('%Y%m%d_%H%M%S')}.json"
         
         try:
-            with open(report_file, 'w') as f:
-                json.dump(report, f, indent=2)
+            if orjson is not None:
+                with open(report_file, 'wb') as f:
+                    f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+            else:
+                with open(report_file, 'w') as f:
+                    json.dump(report, f, indent=2)
             print(f"📄 Report saved to: {report_file}")
         except Exception as e:
             print(f"⚠️  Could not save report: {e}")
-    
-    def _calculate_service_level(self, actor_name):
-        """Calculate service level (weeks without backlog / total weeks)"""
-        if not self.results:
-            return 0.0
-        
-        weeks_without_backlog = sum(
-            1 for r in self.results 
-            if actor_name in r['summary'] and r['summary'][actor_name]['backlog'] == 0
-        )
-        return weeks_without_backlog / len(self.results)
-    
-    def _calculate_avg_inventory(self):
-        """Calculate average inventory across all actors and weeks"""
-        if not self.results:
-            return 0.0
-        
-        total_inv = 0
-        count = 0
-        for result in self.results:
-            for actor_summary in result['summary'].values():
-                total_inv += actor_summary['inventory']
-                count += 1
-        
-        return total_inv / count if count > 0 else 0.0
-    
-    def _calculate_total_backlog(self):
-        """Calculate total backlog across all actors in final week"""
-        if not self.results:
-            return 0
-        
-        final_week = self.results[-1]
-        return sum(
-            actor_summary['backlog'] 
-            for actor_summary in final_week['summary'].values()
-        )
 
 
 def main():
@@ -625,6 +777,9 @@ def main():
 def analyze_decision_outcomes(session, total_weeks, supply_chain, base_url):
     """
     V3.1: Post-mortem analysis - Update DecisionContext with actual outcomes
+    
+    Contexts and their outcome data (order, demand rate, Week+2 backlog)
+    are fetched in a single query per actor instead of one query per context.
     """
     print(f"\n{'='*70}")
     print(f"📊 POST-MORTEM ANALYSIS: Decision Outcomes")
@@ -640,17 +795,35 @@ def analyze_decision_outcomes(session, total_weeks, supply_chain, base_url):
         
         print(f"→ Analyzing {actor_name} decisions...")
         
-        # Query all contexts for this actor
-        list_contexts_query = f"""
+        # Query all contexts for this actor together with their outcome data
+        outcomes_query = f"""
             PREFIX bg: <http://beergame.org/ontology#>
             
-            SELECT ?context ?week
+            SELECT ?context ?week ?orderQty ?demandRate ?nextBacklog
             WHERE {{
                 ?context a bg:DecisionContext ;
                          bg:belongsTo <{actor_uri}> ;
                          bg:forWeek ?weekIRI .
                 
                 ?weekIRI bg:weekNumber ?week .
+                
+                OPTIONAL {{
+                    ?context bg:capturesMetrics ?metrics .
+                    ?metrics bg:demandRate ?demandRate .
+                    
+                    ?order bg:basedOnContext ?context ;
+                           bg:orderQuantity ?orderQty .
+                }}
+                
+                OPTIONAL {{
+                    ?nextInv a bg:Inventory ;
+                             bg:belongsTo <{actor_uri}> ;
+                             bg:forWeek ?nextWeekIRI ;
+                             bg:backlog ?nextBacklog .
+                    
+                    ?nextWeekIRI bg:weekNumber ?nextWeekNum .
+                    FILTER(?nextWeekNum = ?week + 2)
+                }}
             }}
             ORDER BY ?week
         """
@@ -658,7 +831,7 @@ def analyze_decision_outcomes(session, total_weeks, supply_chain, base_url):
         try:
             response = session.post(
                 f"{base_url}/repositories/{repo}",
-                data={'query': list_contexts_query},
+                data={'query': outcomes_query},
                 headers={'Accept': 'application/sparql-results+json'},
                 timeout=10
             )
@@ -671,117 +844,86 @@ def analyze_decision_outcomes(session, total_weeks, supply_chain, base_url):
                     print(f"      (No contexts found)")
                     continue
                 
-                for binding in bindings:
-                    week = int(binding['week']['value'])
-                    context_uri = binding['context']['value']
+                seen_contexts = set()
+                for outcome_binding in bindings:
+                    context_uri = outcome_binding['context']['value']
+                    if context_uri in seen_contexts:
+                        continue
+                    seen_contexts.add(context_uri)
+                    
+                    week = int(outcome_binding['week']['value'])
                     contexts_analyzed += 1
                     
-                    # Query outcome data
-                    outcome_query = f"""
-                        PREFIX bg: <http://beergame.org/ontology#>
+                    if 'orderQty' in outcome_binding:
+                        order_qty = float(outcome_binding['orderQty']['value'])
+                        demand_rate = float(outcome_binding['demandRate']['value'])
+                        
+                        # Determine if caused bullwhip
+                        amplification = order_qty / max(demand_rate, 0.1)
+                        caused_bullwhip = amplification > 1.5
+                        
+                        # Determine if caused stockout
+                        caused_stockout = False
+                        actual_outcome = "Insufficient data (no Week+2 inventory)"
+                        quality = "unknown"
                         
-                        SELECT ?orderQty ?demandRate ?nextBacklog
-                        WHERE {{
-                            <{context_uri}> bg:capturesMetrics ?metrics .
-                            ?metrics bg:demandRate ?demandRate .
+                        if 'nextBacklog' in outcome_binding:
+                            next_backlog = float(outcome_binding['nextBacklog']['value'])
+                            caused_stockout = next_backlog > 0
                             
-                            ?order bg:basedOnContext <{context_uri}> ;
-                                   bg:orderQuantity ?orderQty .
+                            if next_backlog > 0:
+                                actual_outcome = f"Led to stockout of {next_backlog:.0f} units"
+                                quality = "poor"
+                            elif amplification > 2.0:
+                                actual_outcome = f"Caused {amplification:.1f}x amplification"
+                                quality = "suboptimal"
+                            elif amplification < 0.8:
+                                actual_outcome = "Conservative order, stable inventory"
+                                quality = "good"
+                            else:
+                                actual_outcome = "Balanced order, maintained stability"
+                                quality = "optimal"
+                        
+                        # Update context with outcome
+                        update_query = f"""
+                            PREFIX bg: <http://beergame.org/ontology#>
                             
-                            OPTIONAL {{
-                                ?nextInv a bg:Inventory ;
-                                         bg:belongsTo <{actor_uri}> ;
-                                         bg:forWeek ?nextWeekIRI ;
-                                         bg:backlog ?nextBacklog .
-                                
-                                ?nextWeekIRI bg:weekNumber ?nextWeekNum .
-                                FILTER(?nextWeekNum = {week + 2})
+                            DELETE {{
+                                <{context_uri}> bg:actualOutcome ?oldOutcome ;
+                                                bg:outcomeQuality ?oldQuality ;
+                                                bg:causedBullwhip ?oldBullwhip ;
+                                                bg:causedStockout ?oldStockout .
                             }}
-                        }}
-                    """
-                    
-                    outcome_response = session.post(
-                        f"{base_url}/repositories/{repo}",
-                        data={'query': outcome_query},
-                        headers={'Accept': 'application/sparql-results+json'},
-                        timeout=10
-                    )
-                    
-                    if outcome_response.status_code == 200:
-                        outcome_data = outcome_response.json()
-                        outcome_bindings = outcome_data.get('results', {}).get('bindings', [])
+                            INSERT {{
+                                <{context_uri}> bg:actualOutcome "{actual_outcome.replace('"', '\\"')}" ;
+                                                bg:outcomeQuality "{quality}" ;
+                                                bg:causedBullwhip {str(caused_bullwhip).lower()} ;
+                                                bg:causedStockout {str(caused_stockout).lower()} .
+                            }}
+                            WHERE {{
+                                OPTIONAL {{ <{context_uri}> bg:actualOutcome ?oldOutcome }}
+                                OPTIONAL {{ <{context_uri}> bg:outcomeQuality ?oldQuality }}
+                                OPTIONAL {{ <{context_uri}> bg:causedBullwhip ?oldBullwhip }}
+                                OPTIONAL {{ <{context_uri}> bg:causedStockout ?oldStockout }}
+                            }}
+                        """
                         
-                        if outcome_bindings:
-                            outcome_binding = outcome_bindings[0]
-                            order_qty = float(outcome_binding['orderQty']['value'])
-                            demand_rate = float(outcome_binding['demandRate']['value'])
-                            
-                            # Determine if caused bullwhip
-                            amplification = order_qty / max(demand_rate, 0.1)
-                            caused_bullwhip = amplification > 1.5
-                            
-                            # Determine if caused stockout
-                            caused_stockout = False
-                            actual_outcome = "Insufficient data (no Week+2 inventory)"
-                            quality = "unknown"
-                            
-                            if 'nextBacklog' in outcome_binding:
-                                next_backlog = float(outcome_binding['nextBacklog']['value'])
-                                caused_stockout = next_backlog > 0
-                                
-                                if next_backlog > 0:
-                                    actual_outcome = f"Led to stockout of {next_backlog:.0f} units"
-                                    quality = "poor"
-                                elif amplification > 2.0:
-                                    actual_outcome = f"Caused {amplification:.1f}x amplification"
-                                    quality = "suboptimal"
-                                elif amplification < 0.8:
-                                    actual_outcome = "Conservative order, stable inventory"
-                                    quality = "good"
-                                else:
-                                    actual_outcome = "Balanced order, maintained stability"
-                                    quality = "optimal"
-                            
-                            # Update context with outcome
-                            update_query = f"""
-                                PREFIX bg: <http://beergame.org/ontology#>
-                                
-                                DELETE {{
-                                    <{context_uri}> bg:actualOutcome ?oldOutcome ;
-                                                    bg:outcomeQuality ?oldQuality ;
-                                                    bg:causedBullwhip ?oldBullwhip ;
-                                                    bg:causedStockout ?oldStockout .
-                                }}
-                                INSERT {{
-                                    <{context_uri}> bg:actualOutcome "{actual_outcome.replace('"', '\\"')}" ;
-                                                    bg:outcomeQuality "{quality}" ;
-                                                    bg:causedBullwhip {str(caused_bullwhip).lower()} ;
-                                                    bg:causedStockout {str(caused_stockout).lower()} .
-                                }}
-                                WHERE {{
-                                    OPTIONAL {{ <{context_uri}> bg:actualOutcome ?oldOutcome }}
-                                    OPTIONAL {{ <{context_uri}> bg:outcomeQuality ?oldQuality }}
-                                    OPTIONAL {{ <{context_uri}> bg:causedBullwhip ?oldBullwhip }}
-                                    OPTIONAL {{ <{context_uri}> bg:causedStockout ?oldStockout }}
-                                }}
-                            """
-                            
-                            update_response = session.post(
-                                f"{base_url}/repositories/{repo}/statements",
-                                data={'update': update_query},
-                                headers={'Content-Type': 'application/x-www-form-urlencoded'},
-                                timeout=10
-                            )
-                            
-                            if update_response.status_code == 204:
-                                print(f"      Week {week}: {quality} - {actual_outcome[:50]}...")
-                                contexts_updated += 1
-                            else:
-                                print(f"      Week {week}: ✗ Update failed (HTTP {update_response.status_code})")
+                        update_response = session.post(
+                            f"{base_url}/repositories/{repo}/statements",
+                            data={'update': update_query},
+                            headers={'Content-Type': 'application/x-www-form-urlencoded'},
+                            timeout=10
+                        )
+                        
+                        if update_response.status_code == 204:
+                            print(f"      Week {week}: {quality} - {actual_outcome[:50]}...")
+                            contexts_updated += 1
                         else:
-                            print(f"      Week {week}: No outcome data found")
+                            print(f"      Week {week}: ✗ Update failed (HTTP {update_response.status_code})")
                     else:
-                        print(f"      Week {week}: ✗ Query failed (HTTP {outcome_response.status_code})")
+                        print(f"      Week {week}: No outcome data found")
+            else:
+                print(f"      ✗ Query failed (HTTP {response.status_code})")
         
         except Exception as e:
             print(f"      ✗ Exception: {e}")
@@ -0,0 +1,31 @@
+"""
+Beer Game Federated KG - Shared GraphDB HTTP session
+
+Used by the simulation orchestrators so that they all talk to GraphDB
+through the same keep-alive connection pool and retry policy.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def make_session(graphdb_url):
+    """
+    Create a keep-alive session for every GraphDB call
+
+    Args:
+        graphdb_url (str): GraphDB base URL the adapter is mounted on
+
+    Returns:
+        requests.Session: Session with pooled connections (enough for the
+        per-actor worker threads) and a short retry on connection errors
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    )
+    session.mount(graphdb_url, adapter)
+    return session
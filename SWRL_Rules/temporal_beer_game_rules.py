@@ -375,11 +375,44 @@ class TemporalBeerGameRuleExecutor:
             "BG_Distributor", 
             "BG_Factory"
         ]
+        
+        # Week numbers known to exist per repository, loaded on first use
+        self._known_weeks = {}
+    
+    def _load_known_weeks(self, repository):
+        """
+        One SELECT per repository for the bg:Week_N instances it already holds
+        """
+        query = """
+            PREFIX bg: <http://beergame.org/ontology#>
+            SELECT ?week WHERE { ?week a bg:Week . }
+        """
+        
+        endpoint = f"{self.base_url}/repositories/{repository}"
+        headers = {"Accept": "application/sparql-results+json"}
+        
+        weeks = set()
+        try:
+            response = self.session.post(endpoint, data={"query": query}, headers=headers, timeout=30)
+            if response.status_code == 200:
+                for binding in response.json()["results"]["bindings"]:
+                    suffix = binding["week"]["value"].rpartition("#Week_")[2]
+                    if suffix.isdigit():
+                        weeks.add(int(suffix))
+        except Exception as e:
+            print(f"   ⚠️  Could not list existing weeks: {e}")
+        
+        return weeks
     
     def create_week_instance(self, week_number, repository):
         """
         Ensure Week instance exists before running rules
         """
+        if repository not in self._known_weeks:
+            self._known_weeks[repository] = self._load_known_weeks(repository)
+        if week_number in self._known_weeks[repository]:
+            return True
+        
         week_uri = f"bg:Week_{week_number}"
         
         query = f"""
@@ -405,6 +438,7 @@ class TemporalBeerGameRuleExecutor:
         try:
             response = self.session.post(endpoint, data=query, headers=headers, timeout=30)
             if response.status_code == 204:
+                self._known_weeks[repository].add(week_number)
                 return True
             else:
                 print(f"   ⚠️  Warning: Could not create Week_{week_number}: {response.status_code}")
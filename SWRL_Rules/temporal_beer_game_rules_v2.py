@@ -949,4 +949,3 @@ class TemporalBeerGameRuleExecutor:
 # This is a library module - import and use from orchestrator
 # For standalone simulation, use: advanced_simulation_v2.py
 
-.
\ No newline at end of file
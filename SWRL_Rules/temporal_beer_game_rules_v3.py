@@ -505,10 +505,11 @@ class TemporalBeerGameRuleExecutor:
     - Orchestrator only creates external events
     """
     
-    def __init__(self, base_url="http://localhost:7200"):
+    def __init__(self, base_url="http://localhost:7200", session=None):
         self.base_url = base_url
         self.rules = get_temporal_rules()
-        self.session = requests.Session()
+        # Callers may pass their own session to share its connection pool
+        self.session = session if session is not None else requests.Session()
         
         # Repository mapping
         self.repositories = {
@@ -527,27 +528,7 @@ class TemporalBeerGameRuleExecutor:
         print(f"   Creating Week_{week} entities...")
         
         for actor_name, repo_id in self.repositories.items():
-            # Use DELETE+INSERT to ensure weekNumber always exists
-            query = f"""
-                PREFIX bg: <http://beergame.org/ontology#>
-                PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-                PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-                
-                DELETE {{
-                    bg:Week_{week} bg:weekNumber ?oldNum ;
-                                   rdfs:label ?oldLabel .
-                }}
-                INSERT {{
-                    bg:Week_{week} a bg:Week ;
-                        bg:weekNumber "{week}"^^xsd:integer ;
-                        rdfs:label "Week {week}" .
-                }}
-                WHERE {{
-                    # Bind old values if they exist (for DELETE)
-                    OPTIONAL {{ bg:Week_{week} bg:weekNumber ?oldNum }}
-                    OPTIONAL {{ bg:Week_{week} rdfs:label ?oldLabel }}
-                }}
-            """
+            query = self._week_entity_update(week)
             
             endpoint = f"{self.base_url}/repositories/{repo_id}/statements"
             headers = {"Content-Type": "application/sparql-update"}
@@ -563,6 +544,30 @@ class TemporalBeerGameRuleExecutor:
         
         print(f"      ✓ Week_{week} created in all repositories")
     
+    def _week_entity_update(self, week):
+        """SPARQL UPDATE creating bg:Week_N (same for every repository)"""
+        # Use DELETE+INSERT to ensure weekNumber always exists
+        return f"""
+            PREFIX bg: <http://beergame.org/ontology#>
+            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+            
+            DELETE {{
+                bg:Week_{week} bg:weekNumber ?oldNum ;
+                               rdfs:label ?oldLabel .
+            }}
+            INSERT {{
+                bg:Week_{week} a bg:Week ;
+                    bg:weekNumber "{week}"^^xsd:integer ;
+                    rdfs:label "Week {week}" .
+            }}
+            WHERE {{
+                # Bind old values if they exist (for DELETE)
+                OPTIONAL {{ bg:Week_{week} bg:weekNumber ?oldNum }}
+                OPTIONAL {{ bg:Week_{week} rdfs:label ?oldLabel }}
+            }}
+        """
+    
     def create_actor_metrics_snapshot(self, week):
         """
         Create ActorMetrics snapshot for the week if it doesn't exist
@@ -570,64 +575,8 @@ class TemporalBeerGameRuleExecutor:
         """
         print(f"   Creating ActorMetrics snapshots for Week_{week}...")
         
-        prev_week = week - 1
-        
         for actor_name, repo_id in self.repositories.items():
-            # Use namespace-specific prefix
-            namespace_map = {
-                "BG_Retailer": "bg_retailer",
-                "BG_Wholesaler": "bg_wholesaler", 
-                "BG_Distributor": "bg_distributor",
-                "BG_Factory": "bg_factory"
-            }
-            ns = namespace_map[repo_id]
-            
-            query = f"""
-                PREFIX bg: <http://beergame.org/ontology#>
-                PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-                PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-                PREFIX {ns}: <http://beergame.org/{ns.replace('bg_', '')}#>
-                
-                INSERT {{
-                    {ns}:{{actor_name}}_Metrics_W{week} a bg:ActorMetrics ;
-                        bg:forWeek bg:Week_{week} ;
-                        bg:belongsTo {ns}:{{actor_name}} ;
-                        bg:demandRate ?rate ;
-                        bg:inventoryCoverage "0.0"^^xsd:decimal ;
-                        bg:suggestedOrderQuantity "0"^^xsd:integer ;
-                        bg:hasBullwhipRisk "false"^^xsd:boolean ;
-                        bg:hasStockoutRisk "false"^^xsd:boolean ;
-                        rdfs:label "{{actor_name}} Metrics Week {week}" .
-                    
-                    {ns}:{{actor_name}} bg:hasMetrics {ns}:{{actor_name}}_Metrics_W{week} .
-                }}
-                WHERE {{
-                    # Bind specific actor to avoid matching all actors in repo
-                    BIND({ns}:{{actor_name}} AS ?actor)
-                    
-                    # Get demandRate from previous week or default
-                    OPTIONAL {{
-                        ?actor bg:hasMetrics ?prevMetrics .
-                        ?prevMetrics bg:forWeek bg:Week_{prev_week} ;
-                                     bg:demandRate ?prevRate .
-                    }}
-                    BIND(COALESCE(?prevRate, 4.0) AS ?rate)
-                    
-                    # Only create if doesn't exist
-                    FILTER NOT EXISTS {{
-                        {ns}:{{actor_name}} bg:hasMetrics {ns}:{{actor_name}}_Metrics_W{week} .
-                    }}
-                }}
-            """
-            
-            # Replace actor_name placeholder
-            actor_uri_name = {
-                "Retailer": "Retailer_Alpha",
-                "Wholesaler": "Wholesaler_Beta",
-                "Distributor": "Distributor_Gamma",
-                "Factory": "Factory_Delta"
-            }
-            query = query.replace("{actor_name}", actor_uri_name[actor_name])
+            query = self._actor_metrics_update(week, actor_name, repo_id)
             
             endpoint = f"{self.base_url}/repositories/{repo_id}/statements"
             headers = {"Content-Type": "application/sparql-update"}
@@ -644,6 +593,66 @@ class TemporalBeerGameRuleExecutor:
             except Exception as e:
                 print(f"      ✗ Exception for {actor_name}: {e}")
     
+    def _actor_metrics_update(self, week, actor_name, repo_id):
+        """SPARQL UPDATE creating one actor's ActorMetrics for the week"""
+        prev_week = week - 1
+        
+        # Use namespace-specific prefix
+        namespace_map = {
+            "BG_Retailer": "bg_retailer",
+            "BG_Wholesaler": "bg_wholesaler", 
+            "BG_Distributor": "bg_distributor",
+            "BG_Factory": "bg_factory"
+        }
+        ns = namespace_map[repo_id]
+        
+        query = f"""
+            PREFIX bg: <http://beergame.org/ontology#>
+            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+            PREFIX {ns}: <http://beergame.org/{ns.replace('bg_', '')}#>
+            
+            INSERT {{
+                {ns}:{{actor_name}}_Metrics_W{week} a bg:ActorMetrics ;
+                    bg:forWeek bg:Week_{week} ;
+                    bg:belongsTo {ns}:{{actor_name}} ;
+                    bg:demandRate ?rate ;
+                    bg:inventoryCoverage "0.0"^^xsd:decimal ;
+                    bg:suggestedOrderQuantity "0"^^xsd:integer ;
+                    bg:hasBullwhipRisk "false"^^xsd:boolean ;
+                    bg:hasStockoutRisk "false"^^xsd:boolean ;
+                    rdfs:label "{{actor_name}} Metrics Week {week}" .
+                
+                {ns}:{{actor_name}} bg:hasMetrics {ns}:{{actor_name}}_Metrics_W{week} .
+            }}
+            WHERE {{
+                # Bind specific actor to avoid matching all actors in repo
+                BIND({ns}:{{actor_name}} AS ?actor)
+                
+                # Get demandRate from previous week or default
+                OPTIONAL {{
+                    ?actor bg:hasMetrics ?prevMetrics .
+                    ?prevMetrics bg:forWeek bg:Week_{prev_week} ;
+                                 bg:demandRate ?prevRate .
+                }}
+                BIND(COALESCE(?prevRate, 4.0) AS ?rate)
+                
+                # Only create if doesn't exist
+                FILTER NOT EXISTS {{
+                    {ns}:{{actor_name}} bg:hasMetrics {ns}:{{actor_name}}_Metrics_W{week} .
+                }}
+            }}
+        """
+        
+        # Replace actor_name placeholder
+        actor_uri_name = {
+            "Retailer": "Retailer_Alpha",
+            "Wholesaler": "Wholesaler_Beta",
+            "Distributor": "Distributor_Gamma",
+            "Factory": "Factory_Delta"
+        }
+        return query.replace("{actor_name}", actor_uri_name[actor_name])
+    
     def create_inventory_snapshot(self, week):
         """
         Create Inventory snapshot for the new week by copying from previous week
@@ -651,66 +660,10 @@ class TemporalBeerGameRuleExecutor:
         """
         print(f"   Creating Inventory snapshots for Week_{week}...")
         
-        prev_week = week - 1
-        
         for actor_name, repo_id in self.repositories.items():
-            namespace_map = {
-                "BG_Retailer": "bg_retailer",
-                "BG_Wholesaler": "bg_wholesaler", 
-                "BG_Distributor": "bg_distributor",
-                "BG_Factory": "bg_factory"
-            }
-            ns = namespace_map[repo_id]
-            
-            actor_uri_name = {
-                "Retailer": "Retailer_Alpha",
-                "Wholesaler": "Wholesaler_Beta",
-                "Distributor": "Distributor_Gamma",
-                "Factory": "Factory_Delta"
-            }
-            actor_uri = actor_uri_name[actor_name]
-            
-            # Use actor-prefixed naming for Week 2+
-            inventory_name = f"{actor_uri}_Inventory_Week{week}"
-            
-            # Week 1 from TTL uses generic naming without actor prefix
-            if prev_week == 1:
-                prev_inventory_name = "Inventory_Week1"
-            else:
-                prev_inventory_name = f"{actor_uri}_Inventory_Week{prev_week}"
-            
-            query = f"""
-                PREFIX bg: <http://beergame.org/ontology#>
-                PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-                PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-                PREFIX {ns}: <http://beergame.org/{ns.replace('bg_', '')}#>
-                
-                INSERT {{
-                    {ns}:{inventory_name} a bg:Inventory ;
-                        bg:forWeek bg:Week_{week} ;
-                        bg:belongsTo {ns}:{actor_uri} ;
-                        bg:currentInventory ?prevStock ;
-                        bg:backlog ?prevBacklog ;
-                        bg:incomingShipment "0"^^xsd:integer ;
-                        bg:outgoingShipment "0"^^xsd:integer ;
-                        bg:holdingCost ?hCost ;
-                        bg:backlogCost ?bCost ;
-                        rdfs:label "{actor_uri} Inventory Week {week}" .
-                }}
-                WHERE {{
-                    # Get previous week's inventory
-                    {ns}:{prev_inventory_name} a bg:Inventory ;
-                        bg:currentInventory ?prevStock ;
-                        bg:backlog ?prevBacklog ;
-                        bg:holdingCost ?hCost ;
-                        bg:backlogCost ?bCost .
-                    
-                    # Only create if doesn't exist
-                    FILTER NOT EXISTS {{
-                        {ns}:{inventory_name} a bg:Inventory .
-                    }}
-                }}
-            """
+            inventory_name, prev_inventory_name, query = self._inventory_snapshot_update(
+                week, actor_name, repo_id
+            )
             
             endpoint = f"{self.base_url}/repositories/{repo_id}/statements"
             headers = {"Content-Type": "application/sparql-update"}
@@ -727,6 +680,90 @@ class TemporalBeerGameRuleExecutor:
             except Exception as e:
                 print(f"      ✗ Exception for {inventory_name}: {e}")
     
+    def _inventory_snapshot_update(self, week, actor_name, repo_id):
+        """
+        SPARQL UPDATE copying one actor's Inventory into the week
+        
+        Returns (inventory_name, prev_inventory_name, update)
+        """
+        prev_week = week - 1
+        
+        namespace_map = {
+            "BG_Retailer": "bg_retailer",
+            "BG_Wholesaler": "bg_wholesaler", 
+            "BG_Distributor": "bg_distributor",
+            "BG_Factory": "bg_factory"
+        }
+        ns = namespace_map[repo_id]
+        
+        actor_uri_name = {
+            "Retailer": "Retailer_Alpha",
+            "Wholesaler": "Wholesaler_Beta",
+            "Distributor": "Distributor_Gamma",
+            "Factory": "Factory_Delta"
+        }
+        actor_uri = actor_uri_name[actor_name]
+        
+        # Use actor-prefixed naming for Week 2+
+        inventory_name = f"{actor_uri}_Inventory_Week{week}"
+        
+        # Week 1 from TTL uses generic naming without actor prefix
+        if prev_week == 1:
+            prev_inventory_name = "Inventory_Week1"
+        else:
+            prev_inventory_name = f"{actor_uri}_Inventory_Week{prev_week}"
+        
+        query = f"""
+            PREFIX bg: <http://beergame.org/ontology#>
+            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+            PREFIX {ns}: <http://beergame.org/{ns.replace('bg_', '')}#>
+            
+            INSERT {{
+                {ns}:{inventory_name} a bg:Inventory ;
+                    bg:forWeek bg:Week_{week} ;
+                    bg:belongsTo {ns}:{actor_uri} ;
+                    bg:currentInventory ?prevStock ;
+                    bg:backlog ?prevBacklog ;
+                    bg:incomingShipment "0"^^xsd:integer ;
+                    bg:outgoingShipment "0"^^xsd:integer ;
+                    bg:holdingCost ?hCost ;
+                    bg:backlogCost ?bCost ;
+                    rdfs:label "{actor_uri} Inventory Week {week}" .
+            }}
+            WHERE {{
+                # Get previous week's inventory
+                {ns}:{prev_inventory_name} a bg:Inventory ;
+                    bg:currentInventory ?prevStock ;
+                    bg:backlog ?prevBacklog ;
+                    bg:holdingCost ?hCost ;
+                    bg:backlogCost ?bCost .
+                
+                # Only create if doesn't exist
+                FILTER NOT EXISTS {{
+                    {ns}:{inventory_name} a bg:Inventory .
+                }}
+            }}
+        """
+        return inventory_name, prev_inventory_name, query
+    
+    def week_structure_updates(self, week, snapshots=True):
+        """
+        (repository, update) pairs for the week's temporal structure
+        
+        Same operations as create_week_entity and, with snapshots=True,
+        create_actor_metrics_snapshot / create_inventory_snapshot, in the
+        same per-repository order, so callers can send each repository's
+        share as one ';'-separated request
+        """
+        updates = []
+        for actor_name, repo_id in self.repositories.items():
+            updates.append((repo_id, self._week_entity_update(week)))
+            if snapshots:
+                updates.append((repo_id, self._actor_metrics_update(week, actor_name, repo_id)))
+                updates.append((repo_id, self._inventory_snapshot_update(week, actor_name, repo_id)[2]))
+        return updates
+    
     def execute_rule(self, rule_name, repository, dry_run=False):
         """Execute a specific rule on a repository"""
         if rule_name not in self.rules: